@@ -0,0 +1,146 @@
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import degrees
+
+# Search engine used for every query in a batch
+SEARCH_MODE = "bidirectional"
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python batch.py directory [queries] [workers]")
+    directory = sys.argv[1]
+    queries = sys.argv[2] if len(sys.argv) >= 3 else "-"
+    workers = int(sys.argv[3]) if len(sys.argv) == 4 else os.cpu_count()
+
+    # Load once in the parent so forked workers share the graph
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory)
+    # Build the indexes before forking so every worker shares them
+    degrees.get_component_index()
+    degrees.get_name_index()
+    print("Data loaded.", file=sys.stderr)
+
+    if queries == "-":
+        pairs = read_pairs(sys.stdin)
+    else:
+        with open(queries, encoding="utf-8") as f:
+            pairs = read_pairs(f)
+
+    start = time.perf_counter()
+    latencies = []
+    with make_pool(workers) as pool:
+        for answer in pool.imap(answer_query, pairs, chunksize=16):
+            latencies.append(answer.pop("latency"))
+            print(json.dumps(answer))
+    elapsed = time.perf_counter() - start
+    sys.stdout.flush()
+
+    report(latencies, elapsed)
+
+
+def read_pairs(f):
+    """
+    Reads (source, target) pairs of names or person ids, one pair per
+    CSV line, skipping blank lines.
+    """
+    pairs = []
+    for row in csv.reader(f):
+        if not row or not "".join(row).strip():
+            continue
+        if len(row) != 2:
+            sys.exit(f"Expected 'source,target' but got: {','.join(row)}")
+        pairs.append((row[0].strip(), row[1].strip()))
+    return pairs
+
+
+def make_pool(workers):
+    """
+    Returns a process pool whose workers are forked from this process,
+    sharing the loaded graph copy-on-write where fork is available.
+    """
+    return fork_context().Pool(workers)
+
+
+def fork_context():
+    """
+    Returns the multiprocessing context that forks workers where the
+    platform allows it, or the default context otherwise.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def answer_query(pair):
+    """
+    Resolves and connects one (source, target) pair, returning a dict
+    ready to be written as a JSON line plus its latency in seconds.
+    """
+    start = time.perf_counter()
+    source, target = pair
+    answer = {"source": source, "target": target}
+
+    source_id = resolve(source, answer)
+    target_id = resolve(target, answer)
+    if source_id is not None and target_id is not None:
+        answer["source_id"] = source_id
+        answer["target_id"] = target_id
+        path = degrees.shortest_path(source_id, target_id, mode=SEARCH_MODE)
+        answer["degrees"] = None if path is None else len(path)
+        answer["path"] = None if path is None else [list(step) for step in path]
+
+    answer["latency"] = time.perf_counter() - start
+    return answer
+
+
+def resolve(name, answer):
+    """
+    Returns the person id for a name, or records why it could not be
+    resolved in the answer's "error" field and returns None.
+    """
+    person_ids = degrees.person_ids_for_name(name)
+    if len(person_ids) == 1:
+        return person_ids[0]
+    if "error" in answer:
+        pass
+    elif not person_ids:
+        answer["error"] = f"Person not found: {name}"
+    else:
+        answer["error"] = f"Ambiguous name: {name}"
+        answer["candidates"] = person_ids
+    return None
+
+
+def percentile(ordered, fraction):
+    """Returns the nearest-rank percentile of a sorted list."""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[index]
+
+
+def report(latencies, elapsed):
+    """
+    Prints throughput and per-query latency percentiles to stderr.
+    """
+    ordered = sorted(latencies)
+    throughput = len(ordered) / elapsed if elapsed > 0 else 0.0
+    print(f"{len(ordered)} queries in {elapsed:.3f}s "
+          f"({throughput:.1f} queries/s)", file=sys.stderr)
+
+    p50 = percentile(ordered, 0.50) * 1000
+    p90 = percentile(ordered, 0.90) * 1000
+    p99 = percentile(ordered, 0.99) * 1000
+    worst = percentile(ordered, 1.0) * 1000
+    print(f"Latency: p50 {p50:.2f}ms, p90 {p90:.2f}ms, "
+          f"p99 {p99:.2f}ms, max {worst:.2f}ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
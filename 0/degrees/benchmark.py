@@ -0,0 +1,214 @@
+import csv
+import json
+import os
+import random
+import resource
+import sys
+import time
+
+import degrees
+from graph import SNAPSHOT_NAME
+
+# Number of people for each named scale; movies are a third of that
+SCALES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1M": 1_000_000,
+    "10M": 10_000_000,
+}
+
+# Search modes timed by the runner, and the largest graph on which the
+# plain single-frontier BFS is still worth timing
+MODES = degrees.MODES
+MAX_BFS_PEOPLE = 200_000
+
+# Slowdown against the baseline reported as a regression
+REGRESSION_RATIO = 1.2
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "generate" and len(sys.argv) in [4, 5]:
+        seed = int(sys.argv[4]) if len(sys.argv) == 5 else 0
+        generate(sys.argv[2], sys.argv[3], seed)
+    elif command == "run" and len(sys.argv) in [4, 5, 6]:
+        queries = int(sys.argv[4]) if len(sys.argv) >= 5 else 100
+        baseline = sys.argv[5] if len(sys.argv) == 6 else None
+        results = run(sys.argv[2], queries)
+        with open(sys.argv[3], "w") as f:
+            json.dump(results, f, indent=2)
+        if baseline is not None:
+            compare(results, baseline)
+    else:
+        sys.exit("Usage: python benchmark.py generate directory scale [seed]\n"
+                 "       python benchmark.py run directory output.json "
+                 "[queries] [baseline.json]")
+
+
+def generate(directory, scale, seed=0):
+    """
+    Writes a synthetic people.csv, movies.csv and stars.csv at one of
+    the SCALES.
+
+    Cast sizes follow a log-normal distribution (most films list a few
+    stars, some list dozens), and stars are drawn with a power-law bias,
+    so a few prolific actors appear in many films as in the real data.
+    """
+    if scale not in SCALES:
+        sys.exit(f"Scale must be one of: {', '.join(SCALES)}")
+    people_count = SCALES[scale]
+    movies_count = people_count // 3
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person in range(people_count):
+            writer.writerow([person + 1, f"Person {person + 1}",
+                             rng.randint(1900, 2010)])
+
+    with open(os.path.join(directory, "movies.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for movie in range(movies_count):
+            writer.writerow([movie + 1, f"Movie {movie + 1}",
+                             rng.randint(1920, 2020)])
+
+    with open(os.path.join(directory, "stars.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie in range(movies_count):
+            cast_size = min(60, max(1, round(rng.lognormvariate(1.2, 0.6))))
+            cast = set()
+            while len(cast) < cast_size:
+                cast.add(int(people_count * rng.random() ** 2.5))
+            for person in cast:
+                writer.writerow([person + 1, movie + 1])
+
+
+def run(directory, queries, seed=0):
+    """
+    Times load_data, neighbors_for_person and shortest_path on random
+    pairs of the dataset in `directory`, returning the results as a dict.
+    """
+    results = {"directory": directory, "queries": queries}
+
+    # Cold load parses the CSVs and writes the snapshot, warm load maps it
+    snapshot = os.path.join(directory, SNAPSHOT_NAME)
+    if os.path.exists(snapshot):
+        os.remove(snapshot)
+    results["load_csv_s"] = timed(degrees.load_data, directory)
+    results["load_snapshot_s"] = timed(degrees.load_data, directory)
+    graph = degrees.graph
+    results["people"] = len(graph.person_ids)
+    results["movies"] = len(graph.movie_ids)
+    results["stars"] = len(graph.person_movies)
+
+    # Build the indexes up front so they are not charged to one query
+    results["components_s"] = timed(degrees.get_component_index)
+    results["landmarks_s"] = timed(degrees.get_landmark_index)
+
+    rng = random.Random(seed)
+    cast = [person_id for person, person_id in enumerate(graph.person_ids)
+            if len(graph.movies_of(person))]
+    if not cast:
+        sys.exit("No person in the dataset starred in a movie.")
+    sample = [rng.choice(cast) for _ in range(queries)]
+    pairs = [(rng.choice(cast), rng.choice(cast)) for _ in range(queries)]
+
+    start = time.perf_counter()
+    for person_id in sample:
+        degrees.neighbors_for_person(person_id)
+    elapsed = time.perf_counter() - start
+    results["neighbors_us"] = elapsed / len(sample) * 1e6
+
+    # Count expanded people by wrapping the graph instance, so the
+    # searches themselves carry no instrumentation
+    expanded = 0
+    movies_of = graph.movies_of
+
+    def counting_movies_of(person):
+        nonlocal expanded
+        expanded += 1
+        return movies_of(person)
+
+    graph.movies_of = counting_movies_of
+    results["searches"] = {}
+    try:
+        for mode in MODES:
+            if mode == "bfs" and len(graph.person_ids) > MAX_BFS_PEOPLE:
+                continue
+            expanded = 0
+            latencies = []
+            for source, target in pairs:
+                latencies.append(timed(
+                    degrees.shortest_path, source, target, mode=mode))
+            latencies.sort()
+            results["searches"][mode] = {
+                "wall_s": sum(latencies),
+                "p50_ms": latencies[len(latencies) // 2] * 1000,
+                "p99_ms": latencies[min(len(latencies) - 1,
+                                        len(latencies) * 99 // 100)] * 1000,
+                "expanded_mean": expanded / len(pairs),
+            }
+    finally:
+        del graph.movies_of
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def timed(function, *args, **kwargs):
+    """Returns the wall time in seconds of one call."""
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def peak_rss_mb():
+    """Returns this process's peak resident set size in megabytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def compare(results, baseline):
+    """
+    Prints each timing next to the baseline, flagging regressions.
+    """
+    with open(baseline) as f:
+        previous = json.load(f)
+
+    rows = [(key, results[key], previous.get(key))
+            for key in ("load_csv_s", "load_snapshot_s", "neighbors_us")]
+    for mode, search in results["searches"].items():
+        before = previous.get("searches", {}).get(mode, {})
+        rows.append((f"{mode} wall_s", search["wall_s"], before.get("wall_s")))
+        rows.append((f"{mode} expanded_mean", search["expanded_mean"],
+                     before.get("expanded_mean")))
+    rows.append(("peak_rss_mb", results["peak_rss_mb"],
+                 previous.get("peak_rss_mb")))
+
+    regressions = 0
+    for name, now, before in rows:
+        if not before:
+            print(f"{name}: {now:.4g} (no baseline)")
+            continue
+        ratio = now / before
+        flag = ""
+        if ratio > REGRESSION_RATIO:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{name}: {now:.4g} vs {before:.4g} ({ratio:.2f}x){flag}")
+    if regressions:
+        sys.exit(f"{regressions} regression(s) against {baseline}")
+
+
+if __name__ == "__main__":
+    main()
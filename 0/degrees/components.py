@@ -0,0 +1,94 @@
+import sys
+from array import array
+
+from graph import Graph, load_index, save_index
+
+# Index file written next to the CSV files
+COMPONENTS_NAME = "components.index"
+COMPONENTS_MAGIC = b"DEGCOMP\0"
+COMPONENTS_VERSION = 1
+
+
+class ComponentIndex():
+    """
+    Connected component id of every person, so whether two people are
+    connected at all is a single comparison.
+
+    `component[person]` is a dense component number for a person int.
+    """
+
+    def __init__(self, component):
+        self.component = component
+
+    @classmethod
+    def build(cls, graph):
+        """
+        Unions the cast of every movie with union-find, then numbers
+        the resulting sets densely.
+        """
+        parent = array("i", range(len(graph.person_ids)))
+
+        def find(person):
+            # Path halving keeps the trees shallow without recursion
+            while parent[person] != person:
+                parent[person] = parent[parent[person]]
+                person = parent[person]
+            return person
+
+        for movie in range(len(graph.movie_ids)):
+            stars = graph.stars_of(movie)
+            if len(stars) < 2:
+                continue
+            root = find(stars[0])
+            for star in stars[1:]:
+                other = find(star)
+                if other != root:
+                    parent[other] = root
+
+        numbers = {}
+        component = array("i", bytes(4 * len(parent)))
+        for person in range(len(parent)):
+            root = find(person)
+            component[person] = numbers.setdefault(root, len(numbers))
+        return cls(component)
+
+    @classmethod
+    def load(cls, graph, directory):
+        """
+        Returns the index saved for a directory, building and saving it
+        first if it is missing or stale.
+        """
+        arrays = load_index(directory, COMPONENTS_NAME,
+                            COMPONENTS_MAGIC, COMPONENTS_VERSION)
+        if arrays is not None and len(arrays[0]) == len(graph.person_ids):
+            return cls(arrays[0])
+
+        index = cls.build(graph)
+        try:
+            save_index(directory, COMPONENTS_NAME, COMPONENTS_MAGIC,
+                       COMPONENTS_VERSION, [index.component])
+        except OSError:
+            pass
+        return index
+
+    def connected(self, person, other):
+        """Returns True if two person ints are in the same component."""
+        return self.component[person] == self.component[other]
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python components.py directory")
+    directory = sys.argv[1]
+
+    graph = Graph.load(directory)
+    index = ComponentIndex.load(graph, directory)
+    sizes = {}
+    for number in index.component:
+        sizes[number] = sizes.get(number, 0) + 1
+    largest = max(sizes.values(), default=0)
+    print(f"{len(sizes)} components, largest has {largest} people.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,21 @@
-import csv
+import heapq
+import itertools
+import math
 import sys
+from array import array
+from collections import deque
 
-from util import Node, StackFrontier, QueueFrontier
+from components import ComponentIndex
+from graph import Graph
+from landmarks import LandmarkIndex
+from nameindex import NameIndex
+from trees import TreeCache
+from util import Node, StackFrontier, QueueFrontier, PriorityFrontier
+
+# Search engines shortest_path can use, and the one the command line uses
+# unless told otherwise
+MODES = ["bfs", "bidirectional", "bipartite", "landmarks"]
+DEFAULT_MODE = "bidirectional"
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,51 +26,64 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed CSR graph that the searches run on
+graph = None
+
+# Directory the data was loaded from, where derived indexes are saved
+data_directory = None
+
+# Landmark distance index, loaded on the first landmark search
+landmark_index = None
+
+# Connected component of every person, loaded on the first search
+component_index = None
+
+# Recent single-source search trees, created when the data is loaded
+tree_cache = None
+
+# Prefix and trigram index over names, built on the first lookup that
+# is neither an exact name nor a person id
+name_index = None
+
+# Per-movie edge costs for weighted searches, computed on first use
+movie_costs = {}
+
 
 def load_data(directory):
     """
-    Load data from CSV files into memory.
-    """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    Load data from CSV files into memory, or from the binary snapshot
+    of those files if it is still up to date.
+    """
+    global graph, people, movies, data_directory
+    global landmark_index, component_index, tree_cache, name_index
+    global movie_costs
+
+    graph = Graph.load(directory)
+    data_directory = directory
+    landmark_index = None
+    component_index = None
+    tree_cache = TreeCache(graph)
+    name_index = None
+    movie_costs = {}
+    people = graph.people
+    movies = graph.movies
+
+    names.clear()
+    for person_id, name in zip(graph.person_ids, graph.person_names):
+        if name.lower() not in names:
+            names[name.lower()] = {person_id}
+        else:
+            names[name.lower()].add(person_id)
 
 
 def main():
     print(sys.argv)
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python degrees.py [directory] [mode]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    mode = sys.argv[2] if len(sys.argv) == 3 else DEFAULT_MODE
+    if mode not in MODES:
+        sys.exit(f"Unknown search mode: {mode}\nModes: {', '.join(MODES)}")
 
     # Load data from files into memory
     print("Loading data...")
@@ -70,7 +97,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, mode=mode)
 
     if path is None:
         print("Not connected.")
@@ -85,17 +112,38 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, mode="bfs"):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
-    If no possible path, returns None.
+    `mode` selects the search engine: "bfs" grows a single frontier
+    from the source, "bidirectional" grows frontiers from both ends,
+    "bipartite" scans each movie's cast at most once and "landmarks"
+    runs A* guided by the landmark distance index.
+
+    If no possible path, returns None, answering at once when the two
+    people are in different connected components.
     """
-    
+    if not connected(source, target):
+        return None
+
+    if mode == "bidirectional":
+        return bidirectional_path(source, target)
+    elif mode == "bipartite":
+        return bipartite_path(source, target)
+    elif mode == "landmarks":
+        return landmark_path(source, target)
+    elif mode != "bfs":
+        raise ValueError(f"unknown search mode: {mode}")
+
+    # Search on interned ints, translating back to ids only for the result
+    start = graph.person_index[source]
+    goal = graph.person_index[target]
+
     frontier = QueueFrontier()
-    explored = []
-    source_node = Node(state=(None,source), parent=None, action=None)
+    explored = set()
+    source_node = Node(state=(None,start), parent=None, action=None)
     frontier.add(source_node)
     
     while True:
@@ -103,19 +151,19 @@ def shortest_path(source, target):
             return None
         node = frontier.remove()
         
-        if node.state[1] == target:
+        if node.state[1] == goal:
             pairs = []
             
             while node.parent is not None:
                 pairs.append(node.state)
                 node = node.parent
             pairs.reverse()
-            return pairs
+            return graph.path_ids(pairs)
         
-        explored.append(node.state)
-        neighbors = neighbors_for_person(node.state[1])
+        explored.add(node.state)
+        neighbors = graph.neighbors(node.state[1])
         for i in neighbors:
-            if i[1] == target:
+            if i[1] == goal:
                 frontier.reset() # After finding the target, we could clear the frontier.
                 frontier.add(Node(state=i, parent=node, action=None))
                 break
@@ -127,12 +175,438 @@ def shortest_path(source, target):
     raise NotImplementedError
 
 
+def shortest_paths(source, target):
+    """
+    Yields the 1st, 2nd, 3rd, ... shortest lists of (movie_id, person_id)
+    pairs that connect the source to the target, never repeating a person
+    within a path, until no more exist.
+
+    Uses Yen's algorithm: each next path branches off a previous one at
+    some "spur" person, with the steps already taken from that prefix
+    banned. Paths are only computed as the caller asks for them.
+    """
+    if not connected(source, target):
+        return
+    start = graph.person_index[source]
+    goal = graph.person_index[target]
+
+    first = restricted_path(start, goal, set(), set())
+    if first is None:
+        return
+    found = [first]
+    yield graph.path_ids(first)
+
+    candidates = []
+    seen = {tuple(first)}
+    order = itertools.count()
+    while True:
+        previous = found[-1]
+        people = [start] + [person for _, person in previous]
+        for i in range(len(previous)):
+            root = previous[:i]
+            # Steps out of the spur already used by paths sharing this root
+            banned_steps = {path[i] for path in found
+                            if len(path) > i and path[:i] == root}
+            spur_path = restricted_path(
+                people[i], goal, set(people[:i]), banned_steps)
+            if spur_path is None:
+                continue
+            path = root + spur_path
+            if tuple(path) not in seen:
+                seen.add(tuple(path))
+                heapq.heappush(candidates, (len(path), next(order), path))
+
+        if not candidates:
+            return
+        _, _, path = heapq.heappop(candidates)
+        found.append(path)
+        yield graph.path_ids(path)
+
+
+def restricted_path(start, goal, banned_people, banned_steps):
+    """
+    Returns the shortest list of (movie, person) int pairs from start to
+    goal that avoids `banned_people` and does not begin with any of the
+    (movie, person) steps in `banned_steps`, or None.
+    """
+    if start == goal:
+        return []
+    parents = {start: None}
+    frontier = deque([start])
+    while frontier:
+        person = frontier.popleft()
+        for step in graph.neighbors(person):
+            movie, star = step
+            if star in parents or star in banned_people:
+                continue
+            if person == start and step in banned_steps:
+                continue
+            parents[star] = (movie, person)
+            if star == goal:
+                return trace_path(parents, goal)
+            frontier.append(star)
+    return None
+
+
+def weighted_path(source, target, weight="recency"):
+    """
+    Returns the cheapest list of (movie_id, person_id) pairs
+    that connect the source to the target, where each hop costs 1
+    plus a penalty from its movie:
+
+    "recency" adds a tenth per year the movie is older than the newest
+    one, preferring recent films; "cast" adds the log of the cast size,
+    preferring small casts; "hops" adds nothing.
+
+    If no possible path, returns None.
+    """
+    if not connected(source, target):
+        return None
+    costs = get_movie_costs(weight)
+    start = graph.person_index[source]
+    goal = graph.person_index[target]
+
+    # Dijkstra's algorithm: people leave the frontier in order of the
+    # cheapest known cost to reach them, which is then final.
+    frontier = PriorityFrontier()
+    best = {start: 0}
+    explored = set()
+    frontier.add(Node(state=start, parent=None, action=None), 0)
+
+    while not frontier.empty():
+        node = frontier.remove()
+        if node.state == goal:
+            pairs = []
+            while node.parent is not None:
+                pairs.append((node.action, node.state))
+                node = node.parent
+            pairs.reverse()
+            return graph.path_ids(pairs)
+        explored.add(node.state)
+
+        for movie, star in graph.neighbors(node.state):
+            if star in explored:
+                continue
+            cost = best[node.state] + costs[movie]
+            if cost < best.get(star, math.inf):
+                best[star] = cost
+                frontier.add(Node(state=star, parent=node, action=movie), cost)
+    return None
+
+
+def get_movie_costs(weight):
+    """
+    Returns the cost of a hop through each movie int for a weighting,
+    computing it on first use.
+    """
+    if weight in movie_costs:
+        return movie_costs[weight]
+
+    if weight == "hops":
+        costs = array("d", [1.0]) * len(graph.movie_ids)
+    elif weight == "recency":
+        years = [int(year) if year.isdigit() else None
+                 for year in graph.movie_years]
+        known = [year for year in years if year is not None]
+        newest = max(known, default=0)
+        oldest = min(known, default=0)
+        costs = array("d", [
+            1 + (newest - (oldest if year is None else year)) / 10
+            for year in years
+        ])
+    elif weight == "cast":
+        costs = array("d", [
+            1 + math.log(max(1, len(graph.stars_of(movie))))
+            for movie in range(len(graph.movie_ids))
+        ])
+    else:
+        raise ValueError(f"unknown weight: {weight}")
+
+    movie_costs[weight] = costs
+    return costs
+
+
+def paths_from(source, targets):
+    """
+    Returns a dict mapping each target person id to the shortest list
+    of (movie_id, person_id) pairs from the source, or None if the
+    target is not connected.
+
+    All targets are served from one search tree per source, and recent
+    trees are cached so repeated sources skip the search entirely.
+    """
+    tree = tree_cache.get(graph.person_index[source])
+    return {target: tree.path_to(graph.person_index[target])
+            for target in targets}
+
+
+def connected(source, target):
+    """
+    Returns True if any path links the two person ids, using the
+    connected component index.
+    """
+    index = get_component_index()
+    return index.connected(graph.person_index[source],
+                           graph.person_index[target])
+
+
+def get_component_index():
+    """
+    Returns the component index for the loaded data, reading it from
+    (or building it into) the data directory on first use.
+    """
+    global component_index
+    if component_index is None:
+        component_index = ComponentIndex.load(graph, data_directory)
+    return component_index
+
+
+def bidirectional_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both ends.
+
+    Each round expands one whole layer of the smaller frontier, and
+    the search stops as soon as the two sides meet.
+    If no possible path, returns None.
+    """
+    start = graph.person_index[source]
+    goal = graph.person_index[target]
+    if start == goal:
+        return []
+
+    # Map each reached person to the (movie, person) step leading
+    # back towards the side's origin, or None for the origin itself.
+    forward = {start: None}
+    backward = {goal: None}
+    forward_frontier = [start]
+    backward_frontier = [goal]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_layer(
+                forward_frontier, forward, backward)
+        else:
+            backward_frontier, meeting = expand_layer(
+                backward_frontier, backward, forward)
+        if meeting is not None:
+            return graph.path_ids(join_paths(meeting, forward, backward))
+    return None
+
+
+def expand_layer(frontier, parents, other_parents):
+    """
+    Expands every person int in `frontier` by one hop, recording parents.
+
+    Returns the next frontier and the first person also reached by the
+    other side (or None if the two sides have not met yet).
+    """
+    next_frontier = []
+    for person in frontier:
+        for movie, neighbor in graph.neighbors(person):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (movie, person)
+            if neighbor in other_parents:
+                return next_frontier, neighbor
+            next_frontier.append(neighbor)
+    return next_frontier, None
+
+
+def bipartite_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+
+    Walks the person-movie bipartite graph breadth first, marking movies
+    as well as people visited, so each movie's cast is scanned at most
+    once per query however many of its stars the search reaches.
+    If no possible path, returns None.
+    """
+    start = graph.person_index[source]
+    goal = graph.person_index[target]
+    if start == goal:
+        return []
+
+    seen_people = bytearray(len(graph.person_ids))
+    seen_movies = bytearray(len(graph.movie_ids))
+    seen_people[start] = 1
+    parents = {start: None}
+    frontier = deque([start])
+
+    while frontier:
+        person = frontier.popleft()
+        for movie in graph.movies_of(person):
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for star in graph.stars_of(movie):
+                if seen_people[star]:
+                    continue
+                seen_people[star] = 1
+                parents[star] = (movie, person)
+                if star == goal:
+                    return graph.path_ids(trace_path(parents, goal))
+                frontier.append(star)
+    return None
+
+
+def landmark_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+
+    Runs A* from both ends at once, with remaining distances bounded
+    below by the triangle inequality over the landmark index's BFS
+    distances. Both sides use half the difference of the bounds to the
+    target and to the source as their potential, so they agree on the
+    reduced cost of every hop and the search can stop as soon as the
+    two smallest keys cover the shortest meeting found so far.
+    If no possible path, returns None.
+
+    A potential changes by at most one per hop, so a person is queued
+    under its parent's key, which is still a lower bound, and only gets
+    its own bounds, computed once, when it comes off the heap.
+    """
+    index = get_landmark_index()
+    start = graph.person_index[source]
+    goal = graph.person_index[target]
+    if start == goal:
+        return []
+    to_goal = index.goal_distances(goal)
+    to_start = index.goal_distances(start)
+    if index.lower_bound(start, to_goal) is None:
+        return None
+
+    # Maps each person bounded so far to twice its forward potential;
+    # the backward potential is its negation
+    potentials = {}
+
+    def potential(person):
+        if person not in potentials:
+            potentials[person] = (index.lower_bound(person, to_goal)
+                                  - index.lower_bound(person, to_start))
+        return potentials[person]
+
+    # Each side keeps hops and parent steps per reached person, the hops
+    # at which each movie's cast was scanned, its closed people, a heap
+    # of (twice the hops plus the potential, 1 if that key is still the
+    # parent's, person), and the potential's sign. A movie is only
+    # scanned again when reached in fewer hops.
+    forward = ({start: 0}, {start: None}, {}, set(),
+               [(potential(start), 0, start)], 1)
+    backward = ({goal: 0}, {goal: None}, {}, set(),
+                [(-potential(goal), 0, goal)], -1)
+    best = math.inf
+    meeting = None
+
+    while forward[4] and backward[4]:
+        if forward[4][0][0] + backward[4][0][0] >= 2 * best:
+            break
+        side, other = forward, backward
+        if backward[4][0] < forward[4][0]:
+            side, other = backward, forward
+        hops, parents, movie_hops, closed, heap, sign = side
+
+        key, _, person = heapq.heappop(heap)
+        if person in closed:
+            continue
+        true_key = 2 * hops[person] + sign * potential(person)
+        if true_key > key:
+            heapq.heappush(heap, (true_key, 0, person))
+            continue
+        closed.add(person)
+        next_hops = hops[person] + 1
+        for movie in graph.movies_of(person):
+            if movie_hops.get(movie, math.inf) <= next_hops:
+                continue
+            movie_hops[movie] = next_hops
+            for star in graph.stars_of(movie):
+                if hops.get(star, math.inf) <= next_hops:
+                    continue
+                hops[star] = next_hops
+                parents[star] = (movie, person)
+                if star in other[0] and next_hops + other[0][star] < best:
+                    best = next_hops + other[0][star]
+                    meeting = star
+                heapq.heappush(heap, (key, 1, star))
+
+    if meeting is None:
+        return None
+    return graph.path_ids(join_paths(meeting, forward[1], backward[1]))
+
+
+def get_landmark_index():
+    """
+    Returns the landmark index for the loaded data, reading it from
+    (or building it into) the data directory on first use.
+    """
+    global landmark_index
+    if landmark_index is None:
+        landmark_index = LandmarkIndex.load(graph, data_directory)
+    return landmark_index
+
+
+def trace_path(parents, person):
+    """
+    Follows a map of person -> (movie, parent) steps back to the origin,
+    returning the (movie, person) int pairs leading to `person`.
+    """
+    path = []
+    while parents[person] is not None:
+        movie, parent = parents[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+    return path
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Joins the forward and backward parent maps at the meeting person
+    into a single list of (movie, person) int pairs.
+    """
+    path = trace_path(forward, meeting)
+    person = meeting
+    while backward[person] is not None:
+        movie, following = backward[person]
+        path.append((movie, following))
+        person = following
+    return path
+
+
+def person_ids_for_name(name):
+    """
+    Returns every IMDB id matching a person's name, without prompting.
+
+    A string that is itself a known person id resolves to that id.
+    Otherwise a partial or misspelled name resolves through the name
+    index to the people with the closest matching names.
+    """
+    person_ids = sorted(names.get(name.lower(), set()))
+    if not person_ids and name in people:
+        person_ids = [name]
+    if not person_ids:
+        person_ids = get_name_index().lookup(name)
+    return person_ids
+
+
+def get_name_index():
+    """
+    Returns the name index for the loaded data, building it on first use.
+    """
+    global name_index
+    if name_index is None:
+        name_index = NameIndex(graph)
+    return name_index
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
@@ -158,12 +632,9 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    person = graph.person_index[person_id]
+    return {(graph.movie_ids[movie], graph.person_ids[star])
+            for movie, star in graph.neighbors(person)}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,393 @@
+import csv
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Mapping
+
+# Binary snapshot written next to the CSV files after the first load
+SNAPSHOT_NAME = "degrees.snapshot"
+SNAPSHOT_MAGIC = b"DEGSNAP\0"
+SNAPSHOT_VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+CSV_FILES = ("people.csv", "movies.csv", "stars.csv")
+
+# Magic, version, byte order mark, (size, mtime) of each CSV file,
+# then the number of people, movies and stars edges
+SNAPSHOT_HEADER = struct.Struct("=8sII6q3q")
+
+# Magic, version, byte order mark and (size, mtime) of each CSV file,
+# heading the index files derived from a dataset
+INDEX_HEADER = struct.Struct("=8sII6q")
+
+
+class Graph():
+    """
+    Compact view of the degrees dataset.
+
+    People and movies are interned to dense ints (their row order in the
+    CSV files), and the person -> movie and movie -> person adjacency are
+    stored as CSR arrays: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and likewise
+    for the stars of a movie.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+        self.movie_index = {
+            movie_id: i for i, movie_id in enumerate(movie_ids)
+        }
+
+        # Dict-like views keeping the original people/movies interface
+        self.people = PeopleView(self)
+        self.movies = MoviesView(self)
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Builds a graph from people.csv, movies.csv and stars.csv.
+        """
+        person_ids, person_names, person_births = [], [], []
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                person_births.append(row["birth"])
+
+        movie_ids, movie_titles, movie_years = [], [], []
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                movie_ids.append(row["id"])
+                movie_titles.append(row["title"])
+                movie_years.append(row["year"])
+
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        # Collect (person, movie) edges, skipping rows for unknown ids
+        edge_people = array("i")
+        edge_movies = array("i")
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                try:
+                    person = person_index[row["person_id"]]
+                    movie = movie_index[row["movie_id"]]
+                except KeyError:
+                    continue
+                edge_people.append(person)
+                edge_movies.append(movie)
+
+        person_offsets, person_movies = build_csr(
+            len(person_ids), edge_people, edge_movies)
+        movie_offsets, movie_stars = build_csr(
+            len(movie_ids), edge_movies, edge_people)
+
+        return cls(person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   person_offsets, person_movies, movie_offsets, movie_stars)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Loads the graph for a directory, memory-mapping its snapshot when
+        it is up to date and otherwise parsing the CSVs and writing a new
+        snapshot for next time.
+        """
+        graph = load_snapshot(directory)
+        if graph is None:
+            graph = cls.from_csv(directory)
+            try:
+                save_snapshot(graph, directory)
+            except OSError:
+                # A read-only data directory just means no cache
+                pass
+        return graph
+
+    def movies_of(self, person):
+        """Returns the movie ints a person int starred in."""
+        offsets = self.person_offsets
+        return self.person_movies[offsets[person]:offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """Returns the person ints starring in a movie int."""
+        offsets = self.movie_offsets
+        return self.movie_stars[offsets[movie]:offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) int pairs for people who starred with
+        a given person int.
+        """
+        for movie in self.movies_of(person):
+            for star in self.stars_of(movie):
+                yield movie, star
+
+    def path_ids(self, path):
+        """
+        Translates a list of (movie, person) int pairs back into
+        (movie_id, person_id) pairs.
+        """
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+
+def build_csr(size, sources, targets):
+    """
+    Groups `targets` by `sources` into CSR offset and index arrays
+    for `size` source rows.
+    """
+    offsets = array("i", bytes(4 * (size + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    cursor = array("i", offsets)
+    indices = array("i", bytes(4 * len(targets)))
+    for source, target in zip(sources, targets):
+        indices[cursor[source]] = target
+        cursor[source] += 1
+    return offsets, indices
+
+
+def csv_signature(directory):
+    """
+    Returns the size and modification time of each CSV file, which
+    a snapshot must match to be reused.
+    """
+    signature = []
+    for name in CSV_FILES:
+        stat = os.stat(os.path.join(directory, name))
+        signature.extend([stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+def save_snapshot(graph, directory):
+    """
+    Writes the graph to a binary snapshot: the header, the four CSR
+    arrays as native 32-bit ints, then six NUL-separated string tables.
+    """
+    path = os.path.join(directory, SNAPSHOT_NAME)
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, BYTE_ORDER_MARK,
+        *csv_signature(directory),
+        len(graph.person_ids), len(graph.movie_ids), len(graph.person_movies)
+    )
+    tables = [
+        graph.person_ids, graph.person_names, graph.person_births,
+        graph.movie_ids, graph.movie_titles, graph.movie_years
+    ]
+
+    # Write to a temporary file first so readers never see a partial snapshot
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(header)
+            for ints in (graph.person_offsets, graph.person_movies,
+                         graph.movie_offsets, graph.movie_stars):
+                f.write(ints.tobytes())
+            for table in tables:
+                blob = "\0".join(table).encode("utf-8")
+                f.write(struct.pack("=q", len(blob)))
+                f.write(blob)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def load_snapshot(directory):
+    """
+    Memory-maps the directory's snapshot and returns a graph whose CSR
+    arrays point straight into the mapping.
+
+    Returns None if there is no snapshot, or it is stale or unreadable.
+    """
+    path = os.path.join(directory, SNAPSHOT_NAME)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        signature = csv_signature(directory)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        header = SNAPSHOT_HEADER.unpack_from(buffer, 0)
+        magic, version, mark = header[:3]
+        if (magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION
+                or mark != BYTE_ORDER_MARK or list(header[3:9]) != signature):
+            return None
+        people_count, movies_count, edges_count = header[9:]
+
+        view = memoryview(buffer)
+        position = SNAPSHOT_HEADER.size
+
+        def take_ints(count):
+            nonlocal position
+            end = position + 4 * count
+            if end > len(view):
+                raise ValueError("truncated snapshot")
+            ints = view[position:end].cast("i")
+            position = end
+            return ints
+
+        def take_strings(count):
+            nonlocal position
+            length, = struct.unpack_from("=q", buffer, position)
+            position += 8
+            if position + length > len(view):
+                raise ValueError("truncated snapshot")
+            blob = bytes(view[position:position + length])
+            position += length
+            return blob.decode("utf-8").split("\0") if count else []
+
+        person_offsets = take_ints(people_count + 1)
+        person_movies = take_ints(edges_count)
+        movie_offsets = take_ints(movies_count + 1)
+        movie_stars = take_ints(edges_count)
+        person_ids = take_strings(people_count)
+        person_names = take_strings(people_count)
+        person_births = take_strings(people_count)
+        movie_ids = take_strings(movies_count)
+        movie_titles = take_strings(movies_count)
+        movie_years = take_strings(movies_count)
+    except (struct.error, TypeError, ValueError, UnicodeDecodeError):
+        return None
+
+    return Graph(person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars)
+
+
+def save_index(directory, name, magic, version, arrays):
+    """
+    Writes arrays derived from a directory's dataset to an index file
+    tied to the current CSV files, so it is rebuilt when they change.
+    """
+    path = os.path.join(directory, name)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(INDEX_HEADER.pack(magic, version, BYTE_ORDER_MARK,
+                                      *csv_signature(directory)))
+            for values in arrays:
+                f.write(struct.pack("=cq", values.typecode.encode(),
+                                    len(values)))
+                f.write(values.tobytes())
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def load_index(directory, name, magic, version):
+    """
+    Reads the arrays of an index file written by save_index.
+
+    Returns None if there is no such file, or it is stale or unreadable.
+    """
+    path = os.path.join(directory, name)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        signature = csv_signature(directory)
+    except OSError:
+        return None
+
+    try:
+        header = INDEX_HEADER.unpack_from(data, 0)
+        if (header[0] != magic or header[1] != version
+                or header[2] != BYTE_ORDER_MARK
+                or list(header[3:]) != signature):
+            return None
+        arrays = []
+        position = INDEX_HEADER.size
+        while position < len(data):
+            typecode, count = struct.unpack_from("=cq", data, position)
+            position += struct.calcsize("=cq")
+            values = array(typecode.decode())
+            end = position + count * values.itemsize
+            if end > len(data):
+                return None
+            values.frombytes(data[position:end])
+            arrays.append(values)
+            position = end
+    except (struct.error, ValueError, UnicodeDecodeError):
+        return None
+    return arrays
+
+
+class PeopleView(Mapping):
+    """
+    Read-only mapping of person_ids to a dictionary of:
+    name, birth, movies (a set of movie_ids), built on demand.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[movie]
+                       for movie in graph.movies_of(person)}
+        }
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Read-only mapping of movie_ids to a dictionary of:
+    title, year, stars (a set of person_ids), built on demand.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index[movie_id]
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[person]
+                      for person in graph.stars_of(movie)}
+        }
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
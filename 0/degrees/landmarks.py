@@ -0,0 +1,159 @@
+import heapq
+import sys
+from operator import sub
+from array import array
+from collections import deque
+
+from graph import Graph, load_index, save_index
+
+# Index file written next to the CSV files
+LANDMARKS_NAME = "landmarks.index"
+LANDMARKS_MAGIC = b"DEGLMRK\0"
+LANDMARKS_VERSION = 2
+
+# Number of landmarks picked when none is given
+DEFAULT_LANDMARKS = 8
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 0xFFFF
+
+
+class LandmarkIndex():
+    """
+    BFS distances from k landmark people to every person, used to
+    bound the remaining distance of a search with the triangle inequality.
+
+    `distances[person * k + i]` holds the number of hops from landmark
+    `i` to `person`, or UNREACHABLE, so that the k distances of one
+    person are a single slice.
+    """
+
+    def __init__(self, landmarks, distances, people_count):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.people_count = people_count
+
+    @classmethod
+    def build(cls, graph, k=DEFAULT_LANDMARKS):
+        """
+        Picks the k people with the most co-star links as landmarks
+        and runs one BFS from each of them.
+        """
+        people_count = len(graph.person_ids)
+        landmarks = array("i", heapq.nlargest(
+            k, range(people_count),
+            key=lambda person: costar_count(graph, person)
+        ))
+        k = len(landmarks)
+        distances = array("H", bytes(2 * k * people_count))
+        for i, landmark in enumerate(landmarks):
+            distances[i::k] = bfs_distances(graph, landmark)
+        return cls(landmarks, distances, people_count)
+
+        hub = max(range(people_count),
+                  key=lambda person: costar_count(graph, person))
+        nearest = bfs_distances(graph, hub)
+        for i in range(k):
+            landmark = max(range(people_count), key=lambda person: (
+                -1 if nearest[person] == UNREACHABLE else nearest[person]
+            ))
+            column = bfs_distances(graph, landmark)
+            landmarks.append(landmark)
+            distances[i::k] = column
+            nearest = column if i == 0 else array("H", map(min, nearest, column))
+        return cls(landmarks, distances, people_count)
+
+    @classmethod
+    def load(cls, graph, directory, k=DEFAULT_LANDMARKS):
+        """
+        Returns the index saved for a directory, building and saving it
+        first if it is missing, stale or was built with a different k.
+        """
+        arrays = load_index(directory, LANDMARKS_NAME,
+                            LANDMARKS_MAGIC, LANDMARKS_VERSION)
+        people_count = len(graph.person_ids)
+        if arrays is not None:
+            landmarks, distances = arrays
+            if (len(landmarks) == min(k, people_count)
+                    and len(distances) == len(landmarks) * people_count):
+                return cls(landmarks, distances, people_count)
+
+        index = cls.build(graph, k)
+        try:
+            save_index(directory, LANDMARKS_NAME, LANDMARKS_MAGIC,
+                       LANDMARKS_VERSION, [index.landmarks, index.distances])
+        except OSError:
+            pass
+        return index
+
+    def goal_distances(self, goal):
+        """Returns each landmark's distance to the goal person."""
+        k = len(self.landmarks)
+        return self.distances[goal * k:(goal + 1) * k]
+
+    def lower_bound(self, person, goal_distances):
+        """
+        Returns a lower bound on the hops from `person` to the goal
+        whose landmark distances are `goal_distances`, or None if some
+        landmark proves the two are not connected.
+        """
+        k = len(self.landmarks)
+        distances = self.distances[person * k:(person + 1) * k]
+        if UNREACHABLE not in distances and UNREACHABLE not in goal_distances:
+            return max(map(abs, map(sub, distances, goal_distances)),
+                       default=0)
+
+        bound = 0
+        for distance, goal_distance in zip(distances, goal_distances):
+            if distance == UNREACHABLE or goal_distance == UNREACHABLE:
+                if distance != goal_distance:
+                    return None
+                continue
+            difference = abs(goal_distance - distance)
+            if difference > bound:
+                bound = difference
+        return bound
+
+
+def costar_count(graph, person):
+    """Returns the number of (movie, co-star) links of a person int."""
+    return sum(len(graph.stars_of(movie)) for movie in graph.movies_of(person))
+
+
+def bfs_distances(graph, origin):
+    """
+    Returns the hop count from an origin person int to every person,
+    with UNREACHABLE for people in other components.
+    """
+    distances = array("H", [UNREACHABLE]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    distances[origin] = 0
+    frontier = deque([origin])
+    while frontier:
+        person = frontier.popleft()
+        distance = min(distances[person] + 1, UNREACHABLE - 1)
+        for movie in graph.movies_of(person):
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for star in graph.stars_of(movie):
+                if distances[star] == UNREACHABLE:
+                    distances[star] = distance
+                    frontier.append(star)
+    return distances
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python landmarks.py directory [k]")
+    directory = sys.argv[1]
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else DEFAULT_LANDMARKS
+
+    graph = Graph.load(directory)
+    index = LandmarkIndex.load(graph, directory, k)
+    for landmark in index.landmarks:
+        print(f"{graph.person_ids[landmark]}: {graph.person_names[landmark]}")
+
+
+if __name__ == "__main__":
+    main()
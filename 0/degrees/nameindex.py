@@ -0,0 +1,114 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+# Most names returned for a prefix or fuzzy lookup
+MAX_MATCHES = 10
+
+# Lowest trigram similarity accepted as a fuzzy match
+MIN_SIMILARITY = 0.5
+
+# Trigrams shared by more names than this are skipped when rarer ones
+# are available, since they barely narrow the candidates down
+MAX_POSTINGS = 5000
+
+# Names sharing the most trigrams with the text that are scored exactly
+# in a fuzzy lookup; the rest are never looked at
+MAX_CANDIDATES = 100
+
+
+class NameIndex():
+    """
+    Lookup structures over the lowercased names of every person.
+
+    `keys` holds each distinct name once, sorted, so the names starting
+    with a prefix form one contiguous run found by binary search.
+    `trigrams` maps each three-letter window to the key numbers whose
+    name contains it, and `sizes` holds the number of distinct trigrams
+    of each name, for approximate matching.
+    """
+
+    def __init__(self, graph):
+        ids = {}
+        for person, name in enumerate(graph.person_names):
+            ids.setdefault(name.lower(), []).append(person)
+        self.graph = graph
+        self.keys = sorted(ids)
+        self.people = [ids[key] for key in self.keys]
+
+        postings = {}
+        self.sizes = array("H")
+        for number, key in enumerate(self.keys):
+            grams = trigrams(key)
+            for gram in grams:
+                postings.setdefault(gram, array("i")).append(number)
+            self.sizes.append(min(len(grams), 0xFFFF))
+        self.trigrams = postings
+
+    def prefix(self, text, limit=MAX_MATCHES):
+        """Returns up to `limit` names starting with `text`."""
+        text = text.lower()
+        matches = []
+        i = bisect_left(self.keys, text)
+        while (i < len(self.keys) and len(matches) < limit
+               and self.keys[i].startswith(text)):
+            matches.append(self.keys[i])
+            i += 1
+        return matches
+
+    def fuzzy(self, text, limit=MAX_MATCHES):
+        """
+        Returns up to `limit` (score, name) pairs most similar to `text`,
+        best first, scored by the Dice coefficient of their trigram sets.
+        """
+        grams = trigrams(text.lower())
+        known = [gram for gram in sorted(grams) if gram in self.trigrams]
+        rare = [gram for gram in known
+                if len(self.trigrams[gram]) <= MAX_POSTINGS]
+        if not rare and known:
+            rare = [min(known, key=lambda gram: len(self.trigrams[gram]))]
+        common = [gram for gram in known if gram not in rare]
+
+        # Count how many of the rare trigrams each name contains, and
+        # only score the names containing the most
+        shared = Counter()
+        for gram in rare:
+            shared.update(self.trigrams[gram])
+
+        scored = []
+        for number, count in shared.most_common(MAX_CANDIDATES):
+            key = self.keys[number]
+            padded = f"  {key} "
+            count += sum(1 for gram in common if gram in padded)
+            score = 2 * count / (len(grams) + self.sizes[number])
+            if score >= MIN_SIMILARITY:
+                scored.append((score, key))
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        return scored[:limit]
+
+    def lookup(self, text):
+        """
+        Returns the person ids best matching `text`: every person with
+        that exact name, else with the names it is a prefix of, else with
+        the names tied for most similar.
+        """
+        key = text.lower()
+        if not key.strip():
+            return []
+        matches = self.prefix(key)
+        if key in matches:
+            matches = [key]
+        elif not matches:
+            scored = self.fuzzy(key)
+            matches = [match for score, match in scored
+                       if score == scored[0][0]]
+        return [self.graph.person_ids[person]
+                for match in matches
+                for person in self.people[bisect_left(self.keys, match)]]
+
+
+def trigrams(text):
+    """Returns the set of three-character windows of a padded name."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
@@ -0,0 +1,155 @@
+import asyncio
+import concurrent.futures
+import json
+import os
+import signal
+import stat
+import sys
+from concurrent.futures.process import BrokenProcessPool
+
+import degrees
+from batch import fork_context, resolve
+
+# Socket path used when none is given
+DEFAULT_SOCKET = "degrees.sock"
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python server.py directory [socket] [workers]")
+    directory = sys.argv[1]
+    path = sys.argv[2] if len(sys.argv) >= 3 else DEFAULT_SOCKET
+    workers = int(sys.argv[3]) if len(sys.argv) == 4 else os.cpu_count()
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    # Build the indexes before forking so every worker shares them
+    degrees.get_component_index()
+    degrees.get_name_index()
+    degrees.get_landmark_index()
+    print("Data loaded.")
+
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=fork_context())
+
+    # Treat termination like Ctrl-C so the socket file is cleaned up
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        asyncio.run(serve(path, executor))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(cancel_futures=True)
+        remove_socket(path)
+
+
+async def serve(path, executor):
+    """
+    Listens on a Unix socket, handling each client concurrently.
+    """
+    remove_socket(path)
+
+    async def handle_client(reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The rest of an overlong line cannot be told apart
+                    # from the next request, so answer and hang up
+                    await respond(writer, {"error": "Request line too long"})
+                    break
+                if not line:
+                    break
+                await respond(writer, await handle_line(line, executor))
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_unix_server(handle_client, path=path)
+    print(f"Listening on {path}")
+    async with server:
+        await server.serve_forever()
+
+
+async def respond(writer, response):
+    """Writes one response as a JSON line."""
+    writer.write(json.dumps(response).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+async def handle_line(line, executor):
+    """
+    Answers one JSON request line:
+
+        {"op": "person_id_for_name", "name": ...}
+        {"op": "shortest_path", "source": ..., "target": ..., "mode": ...}
+
+    Any "id" in the request is echoed back in the response.
+    """
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+    except ValueError as error:
+        return {"error": f"Invalid request: {error}"}
+
+    response = {}
+    if "id" in request:
+        response["id"] = request["id"]
+    op = request.get("op")
+
+    # Name resolution and searches both run in the workers, so a slow
+    # fuzzy lookup never holds up other clients
+    loop = asyncio.get_running_loop()
+    try:
+        if op == "person_id_for_name":
+            response["person_ids"] = await loop.run_in_executor(
+                executor, degrees.person_ids_for_name,
+                str(request.get("name", "")))
+        elif op == "shortest_path":
+            response.update(await loop.run_in_executor(
+                executor, connect, str(request.get("source", "")),
+                str(request.get("target", "")),
+                request.get("mode", "bidirectional")))
+        else:
+            response["error"] = f"Unknown op: {op}"
+    except BrokenProcessPool as error:
+        response["error"] = f"Worker pool failed: {error}"
+    return response
+
+
+def connect(source, target, mode):
+    """
+    Resolves two names and searches between them in a worker process,
+    returning the response fields with the path as lists so it survives
+    the trip back as JSON.
+    """
+    response = {}
+    source_id = resolve(source, response)
+    target_id = resolve(target, response)
+    if source_id is None or target_id is None:
+        return response
+    try:
+        path = degrees.shortest_path(source_id, target_id, mode=mode)
+    except ValueError as error:
+        response["error"] = str(error)
+    else:
+        response["degrees"] = None if path is None else len(path)
+        response["path"] = (None if path is None
+                            else [list(step) for step in path])
+    return response
+
+
+def remove_socket(path):
+    """Removes a leftover socket file, leaving any other file alone."""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+from array import array
+from collections import OrderedDict, deque
+
+# Memory budget of the cache of recent source trees
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+
+class SearchTree():
+    """
+    Parent pointers of one breadth-first search from a source person,
+    from which the shortest path to any target can be read off.
+
+    `parent_people[person]` is the person int that reached `person`
+    (-1 if unreached, the source points at itself) and
+    `parent_movies[person]` the movie int they share.
+    """
+
+    def __init__(self, graph, source, parent_people, parent_movies):
+        self.graph = graph
+        self.source = source
+        self.parent_people = parent_people
+        self.parent_movies = parent_movies
+
+    @classmethod
+    def build(cls, graph, source):
+        """
+        Runs one bipartite BFS from a source person int, scanning each
+        movie's cast once, and keeps the whole parent-pointer tree.
+        """
+        people_count = len(graph.person_ids)
+        parent_people = array("i", [-1]) * people_count
+        parent_movies = array("i", [-1]) * people_count
+        seen_movies = bytearray(len(graph.movie_ids))
+        parent_people[source] = source
+
+        frontier = deque([source])
+        while frontier:
+            person = frontier.popleft()
+            for movie in graph.movies_of(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in graph.stars_of(movie):
+                    if parent_people[star] == -1:
+                        parent_people[star] = person
+                        parent_movies[star] = movie
+                        frontier.append(star)
+        return cls(graph, source, parent_people, parent_movies)
+
+    def path_to(self, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs from
+        the source to a target person int, or None if unreached.
+        """
+        if self.parent_people[target] == -1:
+            return None
+        path = []
+        person = target
+        while person != self.source:
+            path.append((self.parent_movies[person], person))
+            person = self.parent_people[person]
+        path.reverse()
+        return self.graph.path_ids(path)
+
+    def nbytes(self):
+        """Returns the memory held by the parent arrays."""
+        return (self.parent_people.itemsize * len(self.parent_people)
+                + self.parent_movies.itemsize * len(self.parent_movies))
+
+
+class TreeCache():
+    """
+    Least-recently-used cache of search trees keyed by source person
+    int, evicting the oldest trees once their total size exceeds
+    `max_bytes`.
+    """
+
+    def __init__(self, graph, max_bytes=DEFAULT_CACHE_BYTES):
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.trees = OrderedDict()
+        self.nbytes = 0
+
+    def get(self, source):
+        """Returns the tree for a source, building it if needed."""
+        tree = self.trees.get(source)
+        if tree is not None:
+            self.trees.move_to_end(source)
+            return tree
+
+        tree = SearchTree.build(self.graph, source)
+        self.trees[source] = tree
+        self.nbytes += tree.nbytes()
+        # Always keep the newest tree, even if it alone is over budget
+        while self.nbytes > self.max_bytes and len(self.trees) > 1:
+            _, evicted = self.trees.popitem(last=False)
+            self.nbytes -= evicted.nbytes()
+        return tree
+
+    def clear(self):
+        self.trees.clear()
+        self.nbytes = 0
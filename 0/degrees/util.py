@@ -1,3 +1,8 @@
+import heapq
+import itertools
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -7,28 +12,39 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Number of queued nodes per state, so membership is a hash lookup
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
-        
+
     def reset(self):
-        self.frontier = []
+        self.frontier.clear()
+        self.states.clear()
 
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard(node)
             return node
 
+    def discard(self, node):
+        count = self.states[node.state] - 1
+        if count:
+            self.states[node.state] = count
+        else:
+            del self.states[node.state]
+
 
 class QueueFrontier(StackFrontier):
 
@@ -36,6 +52,54 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard(node)
             return node
+
+
+class PriorityFrontier():
+    """
+    Frontier that removes the node with the lowest priority first.
+
+    Adding a state that is already queued with a higher priority is a
+    decrease-key: the old heap entry is marked dead and skipped when it
+    surfaces, rather than being searched for and removed.
+    """
+
+    def __init__(self):
+        self.frontier = []
+        # Live heap entry [priority, order, node] for each queued state
+        self.entries = {}
+        self.order = itertools.count()
+
+    def add(self, node, priority=0):
+        entry = self.entries.get(node.state)
+        if entry is not None:
+            if entry[0] <= priority:
+                return
+            entry[2] = None
+        entry = [priority, next(self.order), node]
+        self.entries[node.state] = entry
+        heapq.heappush(self.frontier, entry)
+
+    def contains_state(self, state):
+        return state in self.entries
+
+    def priority(self, state):
+        return self.entries[state][0]
+
+    def empty(self):
+        return len(self.entries) == 0
+
+    def reset(self):
+        self.frontier = []
+        self.entries.clear()
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        while True:
+            _, _, node = heapq.heappop(self.frontier)
+            if node is not None:
+                del self.entries[node.state]
+                return node
@@ -0,0 +1,215 @@
+"""
+Headless Tic Tac Toe arena
+
+Plays many games between two engines across a process pool and writes
+nodes searched per move, per-move latency percentiles and outcome
+statistics to JSON, for comparing engines and catching regressions.
+"""
+
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import bitboard
+import book
+import mcts
+import mnk
+import tictactoe as ttt
+
+# Random moves played at the start of each game, so that deterministic
+# engines do not play the same game over and over. They are drawn only
+# from moves that keep the game a draw, so a lost game is always the
+# fault of an engine
+OPENING_PLIES = 2
+
+# Budgets of the time- and playout-limited engines
+MNK_TIME_LIMIT = 1.0
+MCTS_PLAYOUTS = 2000
+
+# Nodes counted since the current move started, in this process
+nodes = 0
+
+
+def random_move(board):
+    return random.choice(sorted(ttt.actions(board)))
+
+
+def opening_move(board):
+    """
+    Returns a random move that keeps the game's minimax value at 0,
+    read from the book, or solved by the bitboard engine without one.
+    """
+    def keeps_draw(action):
+        child = ttt.result(board, action)
+        entry = book.lookup(child)
+        if entry is not None:
+            return entry[0] == 0
+        return bitboard.solve(*bitboard.from_board(child)) == 0
+
+    return random.choice(sorted(
+        action for action in ttt.actions(board) if keeps_draw(action)
+    ))
+
+
+def clear_caches():
+    """
+    Empties every engine's memo tables, so each game's moves are searched
+    from the same cold start whichever worker plays it and whatever that
+    worker played before.
+    """
+    ttt.transposition_table.clear()
+    bitboard.solved.clear()
+    for game in mnk.games.values():
+        game.table.clear()
+    mcts.players.clear()
+
+
+def stats_minimax(board, use_book=True):
+    """Runs tictactoe.minimax, adding its searched nodes to `nodes`."""
+    global nodes
+    stats = ttt.SearchStats()
+    move = ttt.minimax(board, use_book=use_book, stats=stats)
+    nodes += stats.nodes
+    return move
+
+
+ENGINES = {
+    "minimax": stats_minimax,
+    "search": lambda board: stats_minimax(board, use_book=False),
+    "bitboard": bitboard.minimax,
+    "mnk": lambda board: mnk.minimax(board, 3, MNK_TIME_LIMIT),
+    "mcts": lambda board: ttt.monte_carlo(board, playouts=MCTS_PLAYOUTS),
+    "random": random_move,
+}
+
+
+def counted(function):
+    """Wraps a function so each call adds one to `nodes`."""
+    def wrapper(*args, **kwargs):
+        global nodes
+        nodes += 1
+        return function(*args, **kwargs)
+    return wrapper
+
+
+def instrument():
+    """
+    Counts search nodes in this worker by wrapping the per-node function
+    of each engine that has no SearchStats support, leaving the engines
+    themselves untouched.
+    """
+    bitboard.solve = counted(bitboard.solve)
+    mnk.Search.check = counted(mnk.Search.check)
+    mcts.MCTSPlayer.iterate = counted(mcts.MCTSPlayer.iterate)
+
+
+def play_game(game):
+    """
+    Plays one game given as (x_engine, o_engine, seed), returning the
+    winning engine's name (None for a tie) and one (engine, nodes,
+    seconds) record per engine move.
+    """
+    global nodes
+    x_engine, o_engine, seed = game
+    random.seed(seed)
+    board = ttt.initial_state()
+    moves = []
+
+    for _ in range(OPENING_PLIES):
+        board = ttt.result(board, opening_move(board))
+    clear_caches()
+
+    while not ttt.terminal(board):
+        name = x_engine if ttt.player(board) == ttt.X else o_engine
+        nodes = 0
+        start = time.perf_counter()
+        action = ENGINES[name](board)
+        moves.append((name, nodes, time.perf_counter() - start))
+        board = ttt.result(board, action)
+
+    winner = ttt.winner(board)
+    if winner is None:
+        return None, moves
+    return (x_engine if winner == ttt.X else o_engine), moves
+
+
+def percentile(ordered, fraction):
+    """Returns the nearest-rank percentile of a sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(first, second, games, workers):
+    """
+    Plays `games` games between two engines, alternating who plays X,
+    and returns the statistics as a dict.
+    """
+    schedule = [
+        (first, second, seed) if seed % 2 == 0 else (second, first, seed)
+        for seed in range(games)
+    ]
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=instrument) as pool:
+        results = pool.map(play_game, schedule, chunksize=16)
+    elapsed = time.perf_counter() - start
+
+    outcomes = {first: 0, second: 0, "tie": 0}
+    moves = {}
+    for (x_engine, _, _), (winner, records) in zip(schedule, results):
+        outcomes["tie" if winner is None else winner] += 1
+        for name, count, seconds in records:
+            moves.setdefault(name, []).append((count, seconds))
+
+    engines = {}
+    for name, records in moves.items():
+        latencies = sorted(seconds for _, seconds in records)
+        engines[name] = {
+            "moves": len(records),
+            "nodes_mean": sum(count for count, _ in records) / len(records),
+            "nodes_max": max(count for count, _ in records),
+            "latency_ms": {
+                "p50": percentile(latencies, 0.50) * 1000,
+                "p90": percentile(latencies, 0.90) * 1000,
+                "p99": percentile(latencies, 0.99) * 1000,
+                "max": latencies[-1] * 1000,
+            },
+        }
+
+    return {
+        "engines": [first, second],
+        "games": games,
+        "workers": workers,
+        "elapsed_s": elapsed,
+        "games_per_s": games / elapsed if elapsed > 0 else 0.0,
+        "outcomes": outcomes,
+        "moves": engines,
+    }
+
+
+def main():
+    if len(sys.argv) not in [3, 4, 5, 6]:
+        sys.exit("Usage: python arena.py engine engine "
+                 "[games] [workers] [output.json]\n"
+                 f"Engines: {', '.join(ENGINES)}")
+    first, second = sys.argv[1], sys.argv[2]
+    for name in (first, second):
+        if name not in ENGINES:
+            sys.exit(f"Unknown engine: {name}")
+    games = int(sys.argv[3]) if len(sys.argv) >= 4 else 1000
+    workers = int(sys.argv[4]) if len(sys.argv) >= 5 else os.cpu_count()
+
+    results = run(first, second, games, workers)
+    output = json.dumps(results, indent=2)
+    if len(sys.argv) == 6:
+        with open(sys.argv[5], "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Bitboard Tic Tac Toe engine
+
+A position is a pair of 9-bit integers (x, o), one per player, where
+cell (i, j) is bit 3 * i + j. The list-of-lists functions at the bottom
+mirror the tictactoe module, so runner.py can use this engine unchanged.
+"""
+
+from random import randint
+
+from tictactoe import X, O, EMPTY
+
+# Every cell occupied
+FULL = 0b111111111
+
+# Rows, columns and diagonals
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+# Number of set bits in every 9-bit pattern
+POPCOUNT = bytes(bin(bits).count("1") for bits in range(FULL + 1))
+
+# Whether each 9-bit pattern contains a complete line
+WINNING = bytes(
+    any(bits & mask == mask for mask in WIN_MASKS)
+    for bits in range(FULL + 1)
+)
+
+# Maps each (x, o) position searched so far to its minimax value
+solved = {}
+
+
+def from_board(board):
+    """
+    Returns the (x, o) bitboards of a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """
+    Returns the list-of-lists board of (x, o) bitboards.
+    """
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+             else EMPTY for j in range(3)] for i in range(3)]
+
+
+def to_move(x, o):
+    """
+    Returns X if X has the next turn, since X always moves first.
+    """
+    return X if POPCOUNT[x] == POPCOUNT[o] else O
+
+
+def moves(x, o):
+    """
+    Yields the bit of each empty cell.
+    """
+    empty = FULL & ~(x | o)
+    while empty:
+        bit = empty & -empty
+        empty ^= bit
+        yield bit
+
+
+def play(x, o, bit):
+    """
+    Returns the (x, o) position after the player to move takes `bit`.
+    """
+    if POPCOUNT[x] == POPCOUNT[o]:
+        return x | bit, o
+    return x, o | bit
+
+
+def is_terminal(x, o):
+    """
+    Returns True if a player has a line or the board is full.
+    """
+    return bool(WINNING[x] or WINNING[o]) or x | o == FULL
+
+
+def score(x, o):
+    """
+    Returns 1 if X has won, -1 if O has won, 0 otherwise.
+    """
+    if WINNING[x]:
+        return 1
+    if WINNING[o]:
+        return -1
+    return 0
+
+
+def solve(x, o):
+    """
+    Returns the minimax value of a position, memoized in `solved`.
+    """
+    key = (x, o)
+    if key in solved:
+        return solved[key]
+    if is_terminal(x, o):
+        v = score(x, o)
+    elif POPCOUNT[x] == POPCOUNT[o]:
+        v = -2
+        for bit in moves(x, o):
+            v = max(v, solve(x | bit, o))
+            if v == 1:
+                break
+    else:
+        v = 2
+        for bit in moves(x, o):
+            v = min(v, solve(x, o | bit))
+            if v == -1:
+                break
+    solved[key] = v
+    return v
+
+
+def best_move(x, o):
+    """
+    Returns the bit of an optimal move for the player to move.
+    """
+    x_turn = POPCOUNT[x] == POPCOUNT[o]
+    best_bit = None
+    best_value = None
+    for bit in moves(x, o):
+        v = solve(*play(x, o, bit))
+        if best_value is None or (v > best_value if x_turn
+                                  else v < best_value):
+            best_bit = bit
+            best_value = v
+    return best_bit
+
+
+def to_action(bit):
+    """Returns the (i, j) cell of a single-bit move."""
+    return divmod(bit.bit_length() - 1, 3)
+
+
+def to_bit(action):
+    """Returns the bit of an (i, j) cell."""
+    return 1 << (3 * action[0] + action[1])
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return to_board(0, 0)
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return to_move(*from_board(board))
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {to_action(bit) for bit in moves(*from_board(board))}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    x, o = from_board(board)
+    bit = to_bit(action)
+    if (x | o) & bit:
+        raise Exception("Not a valid action!")
+    return to_board(*play(x, o, bit))
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    return {1: X, -1: O, 0: None}[score(*from_board(board))]
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return is_terminal(*from_board(board))
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return score(*from_board(board))
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    x, o = from_board(board)
+
+    # As in tictactoe.minimax, every first move ties, so pick one at random
+    if x | o == 0:
+        return (randint(0, 2), randint(0, 2))
+    if is_terminal(x, o):
+        return None
+    return to_action(best_move(x, o))
@@ -0,0 +1,148 @@
+"""
+Perfect-play table for Tic Tac Toe
+
+Every position reachable from the empty board is solved once and stored
+as one byte in a table indexed by the board read as a base-3 number
+(empty 0, X 1, O 2, cell (i, j) being digit 3 * i + j). The high four
+bits of an entry hold the minimax value plus one and the low four bits
+the index 3 * i + j of a best move, or NO_MOVE for finished games.
+Unreachable positions hold MISSING.
+"""
+
+import os
+import sys
+
+import tictactoe as ttt
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+BOOK_MAGIC = b"TTT1"
+BOOK_SIZE = 3 ** 9
+
+NO_MOVE = 0x0F
+MISSING = 0xFF
+
+# Table loaded from BOOK_FILE on first lookup; False once known missing
+table = None
+
+
+def encode(board):
+    """Returns the table index of a board."""
+    index = 0
+    for i in range(2, -1, -1):
+        for j in range(2, -1, -1):
+            cell = board[i][j]
+            index = index * 3 + (0 if cell == ttt.EMPTY else
+                                 1 if cell == ttt.X else 2)
+    return index
+
+
+def reachable():
+    """Returns every board reachable from the empty board, once each."""
+    boards = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        index = encode(board)
+        if index in boards:
+            continue
+        boards[index] = board
+        if not ttt.terminal(board):
+            for action in ttt.actions(board):
+                stack.append(ttt.result(board, action))
+    return boards
+
+
+def generate():
+    """
+    Solves every reachable position and returns the table as bytes.
+    """
+    entries = bytearray([MISSING]) * BOOK_SIZE
+    for index, board in reachable().items():
+        v = ttt.value(board)
+        move = NO_MOVE
+        if not ttt.terminal(board):
+            # Lowest-numbered best move, so the table is reproducible
+            for action in sorted(ttt.actions(board)):
+                if ttt.value(ttt.result(board, action)) == v:
+                    move = 3 * action[0] + action[1]
+                    break
+        entries[index] = (v + 1) << 4 | move
+    return BOOK_MAGIC + bytes(entries)
+
+
+def load():
+    """Returns the table entries, or None if there is no valid book file."""
+    global table
+    if table is None:
+        try:
+            with open(BOOK_FILE, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = b""
+        if data[:len(BOOK_MAGIC)] == BOOK_MAGIC and \
+                len(data) == len(BOOK_MAGIC) + BOOK_SIZE:
+            table = data[len(BOOK_MAGIC):]
+        else:
+            table = False
+    return table or None
+
+
+def lookup(board):
+    """
+    Returns the (value, action) stored for a board, with action None for
+    finished games, or None if there is no book or the board is not in it.
+    """
+    entries = load()
+    if entries is None:
+        return None
+    entry = entries[encode(board)]
+    if entry == MISSING:
+        return None
+    move = entry & 0x0F
+    action = None if move == NO_MOVE else divmod(move, 3)
+    return ((entry >> 4) - 1, action)
+
+
+def verify(engine):
+    """
+    Plays `engine` (a function from board to action) on every reachable
+    unfinished position, returning the boards where its move does not
+    keep the book's value.
+    """
+    mistakes = []
+    for board in reachable().values():
+        if ttt.terminal(board):
+            continue
+        v, _ = lookup(board)
+        action = engine(board)
+        if lookup(ttt.result(board, action))[0] != v:
+            mistakes.append(board)
+    return mistakes
+
+
+def main():
+    if len(sys.argv) == 1:
+        with open(BOOK_FILE, "wb") as f:
+            f.write(generate())
+        print(f"Wrote {BOOK_FILE}")
+    elif len(sys.argv) == 2 and sys.argv[1] == "verify":
+        if load() is None:
+            sys.exit("No book; run python book.py first.")
+        import bitboard
+        import mnk
+        engines = [
+            ("tictactoe.minimax", ttt.minimax),
+            ("tictactoe.minimax (search)",
+             lambda board: ttt.minimax(board, use_book=False)),
+            ("bitboard.minimax", bitboard.minimax),
+            ("mnk.minimax", lambda board: mnk.minimax(board, 3, None)),
+        ]
+        for name, engine in engines:
+            mistakes = verify(engine)
+            print(f"{name}: {len(mistakes)} mistakes")
+    else:
+        sys.exit("Usage: python book.py [verify]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Monte Carlo tree search player
+
+Plays m,n,k games (see mnk.py) with UCT: moves are chosen by the upper
+confidence bound of their playout results, and each iteration finishes
+with a random playout on bitboards.
+"""
+
+import concurrent.futures
+import math
+import random
+import time
+
+from mnk import get_game
+
+# Exploration constant of the UCT formula
+EXPLORATION = math.sqrt(2)
+
+# Playout budget used when neither a budget nor a time limit is given
+DEFAULT_PLAYOUTS = 10_000
+
+# Iterations between checks of the clock
+CHECK_EVERY = 64
+
+
+class Node():
+    """
+    A position in the search tree, where `mine` holds the marks of the
+    side to move and `theirs` the marks of the side that just moved.
+
+    `wins` counts playout results for the side that just moved (1 for a
+    win, 0.5 for a draw), since that side chose the move into this node.
+    """
+
+    __slots__ = ("mine", "theirs", "parent", "cell", "children",
+                 "untried", "visits", "wins", "over")
+
+    def __init__(self, game, mine, theirs, parent=None, cell=None):
+        self.mine = mine
+        self.theirs = theirs
+        self.parent = parent
+        self.cell = cell
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0
+
+        empty = game.full & ~(mine | theirs)
+        won = cell is not None and game.wins(theirs, cell)
+        self.over = won or not empty
+        self.untried = [] if self.over else [
+            c for c in range(game.m * game.n) if empty >> c & 1
+        ]
+
+    def select(self):
+        """Returns the child with the highest upper confidence bound."""
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: (
+            child.wins / child.visits
+            + EXPLORATION * math.sqrt(log_visits / child.visits)
+        ))
+
+
+class MCTSPlayer():
+    """
+    UCT search for one m,n,k game that keeps its tree between moves, so
+    playouts spent below the move actually played are not thrown away.
+    """
+
+    def __init__(self, m, n, k, seed=None):
+        self.game = get_game(m, n, k)
+        self.random = random.Random(seed)
+        self.root = None
+
+    def reuse(self, mine, theirs):
+        """
+        Returns the node for a position if it is the current root or lies
+        within two plies below it, detached from its parent; else None.
+        """
+        frontier = [self.root] if self.root is not None else []
+        for _ in range(3):
+            for node in frontier:
+                if node.mine == mine and node.theirs == theirs:
+                    node.parent = None
+                    return node
+            frontier = [child for node in frontier for child in node.children]
+        return None
+
+    def search(self, mine, theirs, playouts=None, time_limit=None):
+        """
+        Runs UCT iterations from a position until the playout budget or
+        time limit is spent, returning the root node.
+        """
+        if playouts is None and time_limit is None:
+            playouts = DEFAULT_PLAYOUTS
+        elif playouts is not None:
+            playouts = max(1, playouts)
+        deadline = None
+        if time_limit is not None:
+            deadline = time.perf_counter() + time_limit
+
+        root = self.reuse(mine, theirs)
+        if root is None:
+            root = Node(self.game, mine, theirs)
+        self.root = root
+
+        # Always run at least one iteration so the root has a child
+        iterations = 0
+        while playouts is None or iterations < playouts:
+            if (deadline is not None and iterations
+                    and iterations % CHECK_EVERY == 0
+                    and time.perf_counter() > deadline):
+                break
+            self.iterate(root)
+            iterations += 1
+        return root
+
+    def iterate(self, root):
+        """Runs one selection, expansion, playout and backup step."""
+        game = self.game
+        node = root
+
+        # Selection
+        while not node.untried and node.children:
+            node = node.select()
+
+        # Expansion
+        if node.untried:
+            i = self.random.randrange(len(node.untried))
+            node.untried[i], node.untried[-1] = node.untried[-1], node.untried[i]
+            cell = node.untried.pop()
+            child = Node(game, node.theirs, node.mine | 1 << cell, node, cell)
+            node.children.append(child)
+            node = child
+
+        # Playout, scored for the side that just moved into `node`
+        result = self.playout(node)
+
+        # Backup, flipping the point of view at each ply
+        while node is not None:
+            node.visits += 1
+            node.wins += result
+            result = 1 - result
+            node = node.parent
+
+    def playout(self, node):
+        """
+        Plays random moves from a node to the end of the game, returning
+        1 if the side that just moved into the node wins, 0.5 for a draw
+        and 0 for a loss.
+        """
+        game = self.game
+        if node.over:
+            if node.cell is not None and game.wins(node.theirs, node.cell):
+                return 1
+            return 0.5
+
+        mine, theirs = node.mine, node.theirs
+        cells = list(node.untried)
+        self.random.shuffle(cells)
+        # `mover` is 0 while the side to move at `node` is playing
+        mover = 0
+        for cell in cells:
+            mine |= 1 << cell
+            if game.wins(mine, cell):
+                return 0 if mover == 0 else 1
+            mine, theirs = theirs, mine
+            mover ^= 1
+        return 0.5
+
+    def best_cell(self, mine, theirs, playouts=None, time_limit=None):
+        """Returns the most visited cell after searching a position."""
+        root = self.search(mine, theirs, playouts, time_limit)
+        return max(root.children, key=lambda child: child.visits).cell
+
+
+# Players kept per board size for tree reuse, keyed by (m, n, k)
+players = {}
+
+# Process pools for root-parallel search, keyed by worker count
+pools = {}
+
+
+def root_visits(m, n, k, mine, theirs, playouts, time_limit, seed):
+    """
+    Searches a position with a fresh tree in a worker process and
+    returns the visit count of each root move.
+    """
+    player = MCTSPlayer(m, n, k, seed)
+    root = player.search(mine, theirs, playouts, time_limit)
+    return {child.cell: child.visits for child in root.children}
+
+
+def best_move(board, k=3, playouts=None, time_limit=None, workers=1):
+    """
+    Returns the action (i, j) with the most playout visits for the
+    current player on an m-by-n board where k in a row wins.
+
+    With several workers, each process grows its own tree from the
+    current position (root parallelization) and the visit counts of the
+    root moves are summed; tree reuse only applies to a single worker.
+    Returns None if the game is over.
+    """
+    m, n = len(board), len(board[0])
+    game = get_game(m, n, k)
+    x, o = game.from_board(board)
+    if game.has_won(x) or game.has_won(o) or x | o == game.full:
+        return None
+    mine, theirs = (x, o) if bin(x).count("1") <= bin(o).count("1") else (o, x)
+
+    # Take an immediate win without searching
+    empty = game.full & ~(mine | theirs)
+    for cell in game.order:
+        if empty >> cell & 1 and game.wins(mine | 1 << cell, cell):
+            return divmod(cell, n)
+
+    if workers <= 1:
+        if (m, n, k) not in players:
+            players[(m, n, k)] = MCTSPlayer(m, n, k)
+        cell = players[(m, n, k)].best_cell(mine, theirs, playouts, time_limit)
+        return divmod(cell, n)
+
+    if workers not in pools:
+        pools[workers] = concurrent.futures.ProcessPoolExecutor(workers)
+    share = None if playouts is None else max(1, playouts // workers)
+    futures = [
+        pools[workers].submit(root_visits, m, n, k, mine, theirs,
+                              share, time_limit, random.randrange(2 ** 32))
+        for _ in range(workers)
+    ]
+    visits = {}
+    for future in futures:
+        for cell, count in future.result().items():
+            visits[cell] = visits.get(cell, 0) + count
+    return divmod(max(visits, key=visits.get), n)
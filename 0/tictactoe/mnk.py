@@ -0,0 +1,305 @@
+"""
+m,n,k game engine
+
+Generalizes Tic Tac Toe to boards of m rows and n columns where k marks
+in a row (across, down or diagonally) win. Boards use the same
+list-of-lists format and X, O, EMPTY markers as the tictactoe module.
+"""
+
+import time
+
+from tictactoe import X, O
+
+# Score of a won position, less the number of plies it takes to reach
+WIN = 1_000_000
+
+# Scores beyond this are forced wins or losses, which the transposition
+# table stores relative to their own position instead of the root
+MATE = WIN - 10_000
+
+# Transposition table entry kinds
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Entries kept per game before the transposition table is cleared
+MAX_TABLE_ENTRIES = 1_000_000
+
+# Nodes searched between checks of the clock
+CHECK_EVERY = 1024
+
+
+class Timeout(Exception):
+    """Raised inside a search when its deadline passes or it is stopped."""
+
+
+class Game():
+    """
+    Precomputed geometry of one m,n,k game.
+
+    Positions are pairs of bitboards over m * n cells, where cell (i, j)
+    is bit i * n + j. `windows` holds a mask for every run of k cells,
+    and `windows_through[cell]` the masks of the runs containing a cell.
+    """
+
+    def __init__(self, m, n, k):
+        if k > max(m, n):
+            raise ValueError("k cannot exceed both board dimensions")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.full = (1 << (m * n)) - 1
+
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        mask = 0
+                        for step in range(k):
+                            mask |= 1 << ((i + di * step) * n + j + dj * step)
+                        self.windows.append(mask)
+
+        self.windows_through = [
+            [mask for mask in self.windows if mask >> cell & 1]
+            for cell in range(m * n)
+        ]
+
+        # Try cells on the most windows first, nearest the center first
+        # among equals
+        self.order = sorted(range(m * n), key=lambda cell: (
+            -len(self.windows_through[cell]),
+            abs(cell // n - (m - 1) / 2) + abs(cell % n - (n - 1) / 2)
+        ))
+
+        self.table = {}
+
+    def from_board(self, board):
+        """Returns the (x, o) bitboards of a list-of-lists board."""
+        x = o = 0
+        for i in range(self.m):
+            for j in range(self.n):
+                if board[i][j] == X:
+                    x |= 1 << (i * self.n + j)
+                elif board[i][j] == O:
+                    o |= 1 << (i * self.n + j)
+        return x, o
+
+    def wins(self, bits, cell):
+        """Returns True if `bits` completes a window through `cell`."""
+        for mask in self.windows_through[cell]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def has_won(self, bits):
+        """Returns True if `bits` completes any window."""
+        for mask in self.windows:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def evaluate(self, mine, theirs):
+        """
+        Scores a position for the side whose marks are `mine`, counting
+        windows still open to only one side, weighted by how full they are.
+        """
+        score = 0
+        for mask in self.windows:
+            if mask & theirs == 0:
+                score += WEIGHTS[bin(mask & mine).count("1")]
+            elif mask & mine == 0:
+                score -= WEIGHTS[bin(mask & theirs).count("1")]
+        return score
+
+
+# Value of an open window holding 0, 1, 2, ... marks
+WEIGHTS = [0] + [4 ** count for count in range(1, 32)]
+
+# Games built so far, keyed by (m, n, k)
+games = {}
+
+
+def get_game(m, n, k):
+    """Returns the shared Game for a board size, building it once."""
+    if (m, n, k) not in games:
+        games[(m, n, k)] = Game(m, n, k)
+    return games[(m, n, k)]
+
+
+class Search():
+    """
+    One iterative-deepening alpha-beta search with a time budget.
+
+    Stops at `deadline` (a time.perf_counter() value) or when `stop`,
+    an optional threading.Event, is set.
+    """
+
+    def __init__(self, game, deadline=None, stop=None):
+        self.game = game
+        self.deadline = deadline
+        self.stop = stop
+        self.nodes = 0
+
+    def check(self):
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            if self.stop is not None and self.stop.is_set():
+                raise Timeout
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise Timeout
+
+    def ordered_moves(self, empty, first=None):
+        """Returns the empty cells, the table's best move first."""
+        cells = [cell for cell in self.game.order if empty >> cell & 1]
+        if first is not None and first in cells:
+            cells.remove(first)
+            cells.insert(0, first)
+        return cells
+
+    def negamax(self, mine, theirs, depth, alpha, beta, ply):
+        """
+        Returns the value of a position for the side to move, whose
+        marks are `mine`, searching `depth` plies with alpha-beta.
+        """
+        self.check()
+        game = self.game
+        empty = game.full & ~(mine | theirs)
+        if not empty:
+            return 0
+        if depth == 0:
+            return game.evaluate(mine, theirs)
+
+        key = (mine, theirs)
+        entry = game.table.get(key)
+        best_cell = None
+        if entry is not None:
+            entry_depth, entry_value, kind, best_cell = entry
+            entry_value = from_table(entry_value, ply)
+            if entry_depth >= depth:
+                if kind == EXACT:
+                    return entry_value
+                if kind == LOWER and entry_value >= beta:
+                    return entry_value
+                if kind == UPPER and entry_value <= alpha:
+                    return entry_value
+
+        original_alpha = alpha
+        best = -WIN * 2
+        for cell in self.ordered_moves(empty, best_cell):
+            bit = 1 << cell
+            if game.wins(mine | bit, cell):
+                v = WIN - ply
+            else:
+                v = -self.negamax(theirs, mine | bit, depth - 1,
+                                  -beta, -alpha, ply + 1)
+            if v > best:
+                best = v
+                best_cell = cell
+            alpha = max(alpha, v)
+            if alpha >= beta:
+                break
+
+        if best <= original_alpha:
+            kind = UPPER
+        elif best >= beta:
+            kind = LOWER
+        else:
+            kind = EXACT
+        if len(game.table) >= MAX_TABLE_ENTRIES:
+            game.table.clear()
+        game.table[key] = (depth, to_table(best, ply), kind, best_cell)
+        return best
+
+    def root(self, mine, theirs, depth, first=None):
+        """
+        Searches every root move to `depth` plies, returning the best
+        cell and its value. Updates `self.best` as moves improve it, so
+        a timeout mid-iteration still leaves a move to play.
+        """
+        empty = self.game.full & ~(mine | theirs)
+        alpha = -WIN * 2
+        best_cell = None
+        for cell in self.ordered_moves(empty, first):
+            bit = 1 << cell
+            if self.game.wins(mine | bit, cell):
+                v = WIN
+            else:
+                v = -self.negamax(theirs, mine | bit, depth - 1,
+                                  -WIN * 2, -alpha, 1)
+            if v > alpha:
+                alpha = v
+                best_cell = cell
+                if depth == 1 or self.best is None:
+                    self.best = cell
+        return best_cell, alpha
+
+    def run(self, mine, theirs):
+        """
+        Deepens one ply at a time until the board is solved or time is
+        up, returning the best cell of the deepest finished iteration.
+        """
+        empty = self.game.full & ~(mine | theirs)
+        self.best = None
+        self.depth = 0
+        best = None
+        try:
+            for depth in range(1, bin(empty).count("1") + 1):
+                cell, value = self.root(mine, theirs, depth, best)
+                best = cell
+                self.best = cell
+                self.depth = depth
+                if abs(value) >= WIN - depth:
+                    # A forced win or loss was found; deeper won't change it
+                    break
+        except Timeout:
+            pass
+        return self.best
+
+
+def to_table(value, ply):
+    """
+    Returns a score as counted from the position `ply` plies below the
+    root, so a forced win keeps its distance wherever it is looked up.
+    """
+    if value > MATE:
+        return value + ply
+    if value < -MATE:
+        return value - ply
+    return value
+
+
+def from_table(value, ply):
+    """Returns a score from the table as counted from the root again."""
+    if value > MATE:
+        return value - ply
+    if value < -MATE:
+        return value + ply
+    return value
+
+
+def minimax(board, k=3, time_limit=1.0, stop=None):
+    """
+    Returns the best action (i, j) found for the current player on an
+    m-by-n board where k in a row wins, searching until the board is
+    solved, `time_limit` seconds pass or `stop` is set.
+
+    Returns None if the game is over.
+    """
+    game = get_game(len(board), len(board[0]), k)
+    x, o = game.from_board(board)
+    if game.has_won(x) or game.has_won(o) or x | o == game.full:
+        return None
+
+    x_count = bin(x).count("1")
+    o_count = bin(o).count("1")
+    mine, theirs = (x, o) if x_count <= o_count else (o, x)
+
+    deadline = None
+    if time_limit is not None:
+        deadline = time.perf_counter() + time_limit
+    search = Search(game, deadline, stop)
+    cell = search.run(mine, theirs)
+    return divmod(cell, game.n)
@@ -1,5 +1,6 @@
 import pygame
 import sys
+import threading
 import time
 
 import tictactoe as ttt
@@ -16,16 +17,60 @@ screen = pygame.display.set_mode(size)
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+smallFont = pygame.font.Font("OpenSans-Regular.ttf", 14)
+
+# Shortest time the AI appears to think, so its moves are not instant
+ai_delay = 0.5
+
+
+def think(board, stop, result):
+    """
+    Computes the AI's move in a background thread so the window keeps
+    drawing, storing it and its search stats in `result` unless `stop`
+    was set meanwhile. Setting `stop` also cuts the search short.
+    """
+    stats = ttt.SearchStats()
+    move = ttt.minimax(board, stats=stats, stop=stop)
+    if not stop.is_set():
+        result.append((move, stats))
+
+
+def start_ai(board):
+    """
+    Starts the AI search on a copy of the board, returning the event
+    that cancels it and the list its move will be appended to.
+    """
+    stop = threading.Event()
+    result = []
+    board = [row[:] for row in board]
+    threading.Thread(target=think, args=(board, stop, result),
+                     daemon=True).start()
+    return stop, result
+
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# Cancel event and result of the AI search in progress, if any
+ai_stop = None
+ai_result = None
+ai_started = 0
+
+# Stats of the AI's last search, drawn while show_stats is on (press S)
+ai_stats = None
+show_stats = False
 
 while True:
 
+    reset = False
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             sys.exit()
+        # Pressing R starts over at any time, even while the AI thinks
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+            reset = True
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_s:
+            show_stats = not show_stats
 
     screen.fill(black)
 
@@ -102,21 +147,22 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = "." * (int(time.time() * 3) % 3 + 1)
+            title = f"Computer thinking{dots:<3}"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, polling the background search each frame
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
+            if ai_result is None:
+                ai_stop, ai_result = start_ai(board)
+                ai_started = time.time()
+            elif ai_result and time.time() - ai_started >= ai_delay:
+                move, ai_stats = ai_result[0]
                 board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+                ai_stop = ai_result = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -139,8 +185,20 @@ while True:
                 mouse = pygame.mouse.get_pos()
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                    reset = True
+
+    # Draw the last search's stats in the top left corner
+    if show_stats and ai_stats is not None:
+        for i, line in enumerate(ai_stats.lines()):
+            text = smallFont.render(line, True, white)
+            screen.blit(text, (10, 10 + 16 * i))
+
+    if reset:
+        # Cancel any search in progress so its move is never played
+        if ai_stop is not None:
+            ai_stop.set()
+        ai_stop = ai_result = ai_stats = None
+        user = None
+        board = ttt.initial_state()
 
     pygame.display.flip()
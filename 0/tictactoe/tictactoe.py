@@ -2,7 +2,10 @@
 Tic Tac Toe Player
 """
 
+import json
 import math
+import sys
+import time
 from copy import deepcopy
 from random import randint
 
@@ -10,6 +13,26 @@ X = "X"
 O = "O"
 EMPTY = None
 
+# The 8 rotations and reflections of the board, each given as the
+# (i, j) cell that lands on every position when read in row-major order
+SYMMETRIES = [
+    [(i, j) for i in range(3) for j in range(3)],
+    [(2 - j, i) for i in range(3) for j in range(3)],
+    [(2 - i, 2 - j) for i in range(3) for j in range(3)],
+    [(j, 2 - i) for i in range(3) for j in range(3)],
+    [(i, 2 - j) for i in range(3) for j in range(3)],
+    [(2 - i, j) for i in range(3) for j in range(3)],
+    [(j, i) for i in range(3) for j in range(3)],
+    [(2 - j, 2 - i) for i in range(3) for j in range(3)],
+]
+
+# Maps the canonical key of each board searched so far to its minimax value
+transposition_table = {}
+
+
+class Cancelled(Exception):
+    """Raised inside a search once its stop event is set."""
+
 
 def initial_state():
     """
@@ -128,50 +151,215 @@ def utility(board):
     raise NotImplementedError
 
 
-def max_value(board):
+def canonical(board):
+    """
+    Returns a key shared by a board and all of its rotations and
+    reflections, which have the same minimax value.
+    """
+    symbols = {X: "X", O: "O", EMPTY: "."}
+    return min(
+        "".join(symbols[board[i][j]] for i, j in symmetry)
+        for symmetry in SYMMETRIES
+    )
+
+
+def value(board, stats=None, depth=0, stop=None):
+    """
+    Returns the minimax value of a board, looking it up in the
+    transposition table before searching. Raises Cancelled if `stop`,
+    an optional threading.Event, is set.
+    """
+    if stop is not None and stop.is_set():
+        raise Cancelled
+    key = canonical(board)
+    if key in transposition_table:
+        if stats is not None:
+            stats.cache_hits += 1
+        return transposition_table[key]
+    if player(board) == X:
+        v = max_value(board, stats, depth, stop)[0]
+    else:
+        v = min_value(board, stats, depth, stop)[0]
+    transposition_table[key] = v
+    return v
+
+
+def max_value(board, stats=None, depth=0, stop=None):
+    if stats is not None:
+        start = stats.enter(depth)
     if terminal(board):
+        if stats is not None:
+            stats.terminals += 1
+            stats.leave(depth, start)
         return (utility(board), None)
     v = -2
     best_move = (-1,-1)
 
+    # Each child's value is computed once and then reused
     for action in actions(board):
-        if min_value(result(board,action))[0] > v:
-            v = min_value(result(board,action))[0]
+        child_value = value(result(board, action), stats, depth + 1, stop)
+        if child_value > v:
+            v = child_value
             best_move = action
             if v == 1:
+                if stats is not None:
+                    stats.cutoffs += 1
                 break
+    if stats is not None:
+        stats.leave(depth, start)
     return (v, best_move)
 
 
-def min_value(board):
+def min_value(board, stats=None, depth=0, stop=None):
+    if stats is not None:
+        start = stats.enter(depth)
     if terminal(board):
+        if stats is not None:
+            stats.terminals += 1
+            stats.leave(depth, start)
         return (utility(board), None)
     v = 2
     best_move = (-1,-1)
 
     for action in actions(board):
-        if max_value(result(board,action))[0] < v:
-            v = max_value(result(board,action))[0]
+        child_value = value(result(board, action), stats, depth + 1, stop)
+        if child_value < v:
+            v = child_value
             best_move = action
             if v == -1:
+                if stats is not None:
+                    stats.cutoffs += 1
                 break
+    if stats is not None:
+        stats.leave(depth, start)
     return (v, best_move)
 
 
-def minimax(board):
+def minimax(board, use_book=True, stats=None, stop=None):
     """
     Returns the optimal action for the current player on the board.
+
+    Reads the move from the perfect-play table written by book.py when
+    that table exists, and searches otherwise. Pass a SearchStats as
+    `stats` to have the search counted into it, and a threading.Event as
+    `stop` to be able to abandon the search, which then returns None.
     """
+    if stats is not None:
+        start = time.perf_counter()
 
     # The first move of the game can be selected randomly, since the optimal result will always be tie whatever the first move is.
     # Namely, the max_value of an empty board is always 0.
     if count(board) == (0,0):
         return (randint(0,2),randint(0,2))
 
+    if use_book:
+        import book
+
+        entry = book.lookup(board)
+        if entry is not None:
+            if stats is not None:
+                stats.book_hits += 1
+                stats.elapsed += time.perf_counter() - start
+            return entry[1]
+
     # After the first move, we use min_value and max_value function to get the optimal results.
-    if player(board) == X:
-        return max_value(board)[1]
-    else:
-        return min_value(board)[1]
-    
-    raise NotImplementedError
+    try:
+        if player(board) == X:
+            move = max_value(board, stats, 0, stop)[1]
+        else:
+            move = min_value(board, stats, 0, stop)[1]
+    except Cancelled:
+        move = None
+    if stats is not None:
+        stats.elapsed += time.perf_counter() - start
+    return move
+
+
+class SearchStats():
+    """
+    Counters that minimax, max_value and min_value fill in when given
+    one, for seeing into a search. Searches without it skip all counting.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.terminals = 0
+        self.cache_hits = 0
+        self.cutoffs = 0
+        self.book_hits = 0
+        self.elapsed = 0.0
+        # Nodes searched, and seconds spent in their subtrees, per ply
+        self.depth_nodes = {}
+        self.depth_times = {}
+
+    def enter(self, depth):
+        """Counts a node at a ply, returning its start time."""
+        self.nodes += 1
+        self.depth_nodes[depth] = self.depth_nodes.get(depth, 0) + 1
+        return time.perf_counter()
+
+    def leave(self, depth, start):
+        """Adds the time since `start` to a ply's total."""
+        self.depth_times[depth] = (self.depth_times.get(depth, 0.0)
+                                   + time.perf_counter() - start)
+
+    def as_dict(self):
+        return {
+            "nodes": self.nodes,
+            "terminals": self.terminals,
+            "cache_hits": self.cache_hits,
+            "cutoffs": self.cutoffs,
+            "book_hits": self.book_hits,
+            "elapsed_ms": self.elapsed * 1000,
+            "depth_nodes": self.depth_nodes,
+            "depth_ms": {depth: self.depth_times[depth] * 1000
+                         for depth in sorted(self.depth_times)},
+        }
+
+    def lines(self):
+        """Returns a short text summary, one line per counter."""
+        lines = [
+            f"nodes: {self.nodes}",
+            f"terminals: {self.terminals}",
+            f"cache hits: {self.cache_hits}",
+            f"cutoffs: {self.cutoffs}",
+            f"book hits: {self.book_hits}",
+            f"time: {self.elapsed * 1000:.2f} ms",
+        ]
+        for depth in sorted(self.depth_nodes):
+            lines.append(f"ply {depth}: {self.depth_nodes[depth]} nodes, "
+                         f"{self.depth_times.get(depth, 0.0) * 1000:.2f} ms")
+        return lines
+
+
+def monte_carlo(board, k=3, playouts=None, time_limit=None, workers=1):
+    """
+    Returns an action for the current player chosen by Monte Carlo tree
+    search, for boards too large for minimax to search exhaustively.
+
+    Searches for `playouts` random games or `time_limit` seconds over
+    `workers` processes; k is the number in a row needed to win.
+    """
+    import mcts
+
+    return mcts.best_move(board, k, playouts, time_limit, workers)
+
+
+def main():
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python tictactoe.py [board]\n"
+                 "where board is 9 cells of X, O or . read row by row")
+    cells = sys.argv[1] if len(sys.argv) == 2 else "X........"
+    if len(cells) != 9 or any(cell not in "XO." for cell in cells.upper()):
+        sys.exit("Board must be 9 cells of X, O or .")
+    board = [[{"X": X, "O": O, ".": EMPTY}[cell] for cell in row]
+             for row in (cells.upper()[0:3], cells.upper()[3:6],
+                         cells.upper()[6:9])]
+
+    stats = SearchStats()
+    move = minimax(board, use_book=False, stats=stats)
+    print(json.dumps({"move": move, "stats": stats.as_dict()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import itertools
+
+from logic import Sentence, Symbol, Not, And, Or, Implication, Biconditional
+
+# Symbols enumerated within one block, which then covers 2 ** BLOCK_SYMBOLS
+# models held as the bits of one Python int
+BLOCK_SYMBOLS = 14
+
+
+def compile_sentence(sentence):
+    """
+    Returns a function of (columns, ones) that evaluates a sentence in
+    many models at once. `columns` maps each symbol name to an int whose
+    bit i is the symbol's value in model i, and `ones` has a bit set for
+    every model; the result has bit i set if the sentence is true in model i.
+    """
+    Sentence.validate(sentence)
+    if isinstance(sentence, Symbol):
+        name = sentence.name
+        return lambda columns, ones: columns[name]
+    if isinstance(sentence, Not):
+        operand = compile_sentence(sentence.operand)
+        return lambda columns, ones: ones ^ operand(columns, ones)
+    if isinstance(sentence, And):
+        conjuncts = [compile_sentence(c) for c in sentence.conjuncts]
+
+        def conjunction(columns, ones):
+            bits = ones
+            for conjunct in conjuncts:
+                bits &= conjunct(columns, ones)
+                if not bits:
+                    break
+            return bits
+        return conjunction
+    if isinstance(sentence, Or):
+        disjuncts = [compile_sentence(d) for d in sentence.disjuncts]
+
+        def disjunction(columns, ones):
+            bits = 0
+            for disjunct in disjuncts:
+                bits |= disjunct(columns, ones)
+                if bits == ones:
+                    break
+            return bits
+        return disjunction
+    if isinstance(sentence, Implication):
+        antecedent = compile_sentence(sentence.antecedent)
+        consequent = compile_sentence(sentence.consequent)
+        return lambda columns, ones: (
+            (ones ^ antecedent(columns, ones)) | consequent(columns, ones)
+        )
+    if isinstance(sentence, Biconditional):
+        left = compile_sentence(sentence.left)
+        right = compile_sentence(sentence.right)
+        return lambda columns, ones: (
+            ones ^ left(columns, ones) ^ right(columns, ones)
+        )
+    raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+
+def column(index, count):
+    """
+    Returns the column of symbol `index` in a block enumerating `count`
+    symbols: bit i is set when bit `index` of i is.
+    """
+    half = 1 << index
+    bits = ((1 << half) - 1) << half
+    period = half * 2
+    while period < 1 << count:
+        bits |= bits << period
+        period *= 2
+    return bits
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, testing a block of
+    2 ** BLOCK_SYMBOLS models per evaluation of the compiled sentences.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    inner = symbols[:BLOCK_SYMBOLS]
+    outer = symbols[BLOCK_SYMBOLS:]
+
+    ones = (1 << (1 << len(inner))) - 1
+    columns = {name: column(i, len(inner)) for i, name in enumerate(inner)}
+    knowledge_bits = compile_sentence(knowledge)
+    query_bits = compile_sentence(query)
+
+    # Each assignment of the outer symbols is one block of models
+    for values in itertools.product([0, ones], repeat=len(outer)):
+        columns.update(zip(outer, values))
+        if knowledge_bits(columns, ones) & ~query_bits(columns, ones):
+            return False
+    return True
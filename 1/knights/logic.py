@@ -1,8 +1,108 @@
+import inspect
 import itertools
+import weakref
+
+# Live sentences keyed by (class, arguments), so that structurally
+# identical ones are one shared object. Hash-consing only covers
+# sentences without an And inside: an And grows through add, so it and
+# everything containing it stay separate objects
+interned = weakref.WeakValueDictionary()
 
 
 class Sentence():
 
+    __slots__ = ("__weakref__", "_hash", "_symbols", "_stale", "_parents")
+
+    # Set on classes whose instances can change after they are created
+    mutable = False
+
+    def __new__(cls, *arguments, **keywords):
+        """
+        Returns a new sentence of this class, or the existing one with
+        these arguments if neither it nor anything in it can change.
+        """
+        if keywords:
+            bound = inspect.signature(cls.setup).bind(
+                None, *arguments, **keywords)
+            arguments = bound.args[1:]
+        fixed = not cls.mutable and not any(
+            isinstance(argument, Sentence) and argument._stale is not None
+            for argument in arguments
+        )
+        if fixed:
+            key = (cls, arguments)
+            sentence = interned.get(key)
+            if sentence is not None:
+                return sentence
+
+        sentence = object.__new__(cls)
+        sentence.setup(*arguments)
+        if fixed:
+            sentence._hash = sentence.compute_hash()
+            sentence._symbols = sentence.compute_symbols()
+            sentence._stale = None
+            interned[key] = sentence
+        else:
+            # Computed on first use, and again whenever an And inside
+            # changes, which marks its containers through _parents
+            sentence._stale = True
+            sentence._parents = weakref.WeakSet()
+            for argument in sentence.arguments():
+                sentence.contain(argument)
+        return sentence
+
+    def __reduce__(self):
+        # Rebuild through __new__, so copies are interned like originals
+        return (type(self), self.arguments())
+
+    def setup(self, *arguments):
+        """Initializes a new sentence from its arguments."""
+
+    def arguments(self):
+        """Returns the arguments the sentence was created from."""
+        return ()
+
+    def contain(self, argument):
+        """Records that this sentence must go stale when `argument` does."""
+        if isinstance(argument, Sentence) and argument._stale is not None:
+            argument._parents.add(self)
+
+    def invalidate(self):
+        """
+        Marks the cached hash and symbols of this sentence, and of every
+        sentence containing it, as stale.
+        """
+        pending = [self]
+        while pending:
+            sentence = pending.pop()
+            # A stale sentence's containers were marked stale with it
+            if not sentence._stale:
+                sentence._stale = True
+                pending.extend(sentence._parents)
+
+    def compute_hash(self):
+        return object.__hash__(self)
+
+    def compute_symbols(self):
+        return frozenset().union(
+            *[argument.cached_symbols() for argument in self.arguments()]
+        )
+
+    def refresh(self):
+        """Recomputes the cached hash and symbols if they may be stale."""
+        if self._stale:
+            self._hash = self.compute_hash()
+            self._symbols = self.compute_symbols()
+            self._stale = False
+
+    def cached_hash(self):
+        self.refresh()
+        return self._hash
+
+    def cached_symbols(self):
+        self.refresh()
+        return self._symbols
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -13,7 +113,7 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.cached_symbols())
 
     @classmethod
     def validate(cls, sentence):
@@ -44,14 +144,27 @@ class Sentence():
 
 class Symbol(Sentence):
 
-    def __init__(self, name):
+    __slots__ = ("name",)
+
+    def setup(self, name):
         self.name = name
 
+    def arguments(self):
+        return (self.name,)
+
+    def compute_hash(self):
+        return hash(("symbol", self.name))
+
+    def compute_symbols(self):
+        return frozenset([self.name])
+
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self.cached_hash()
 
     def __repr__(self):
         return self.name
@@ -65,20 +178,28 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
-
 
 class Not(Sentence):
-    def __init__(self, operand):
+
+    __slots__ = ("operand",)
+
+    def setup(self, operand):
         Sentence.validate(operand)
         self.operand = operand
 
+    def arguments(self):
+        return (self.operand,)
+
+    def compute_hash(self):
+        return hash(("not", hash(self.operand)))
+
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand
+        )
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        return self.cached_hash()
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,24 +210,35 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
-
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+
+    __slots__ = ("conjuncts",)
+
+    # Knowledge bases grow through add, so an And is never shared
+    mutable = True
+
+    def setup(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
 
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+    def arguments(self):
+        return tuple(self.conjuncts)
 
-    def __hash__(self):
+    def compute_hash(self):
         return hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
 
+    def __eq__(self, other):
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts
+        )
+
+    def __hash__(self):
+        return self.cached_hash()
+
     def __repr__(self):
         conjunctions = ", ".join(
             [str(conjunct) for conjunct in self.conjuncts]
@@ -116,6 +248,8 @@ class And(Sentence):
     def add(self, conjunct):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        self.contain(conjunct)
+        self.invalidate()
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,24 +260,32 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
-
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+
+    __slots__ = ("disjuncts",)
+
+    def setup(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        self.disjuncts = disjuncts
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+    def arguments(self):
+        return self.disjuncts
 
-    def __hash__(self):
+    def compute_hash(self):
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
 
+    def __eq__(self, other):
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts
+        )
+
+    def __hash__(self):
+        return self.cached_hash()
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
@@ -157,24 +299,32 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
-
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+
+    __slots__ = ("antecedent", "consequent")
+
+    def setup(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
 
+    def arguments(self):
+        return (self.antecedent, self.consequent)
+
+    def compute_hash(self):
+        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return self.cached_hash()
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,24 +338,32 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
-
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+
+    __slots__ = ("left", "right")
+
+    def setup(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
         self.right = right
 
+    def arguments(self):
+        return (self.left, self.right)
+
+    def compute_hash(self):
+        return hash(("biconditional", hash(self.left), hash(self.right)))
+
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return self.cached_hash()
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -221,12 +379,25 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+def model_check(knowledge, query, backend="enumerate"):
+    """
+    Checks if knowledge base entails query.
+
+    The "enumerate" backend tries every model of the symbols; "bitwise"
+    tries them too, but a block of models at a time as the bits of an int
+    (see bitwise.py); the "sat" backend asks the SAT solver in sat.py
+    whether knowledge base and not query can both hold, which scales to
+    many more symbols.
+    """
+    if backend == "bitwise":
+        import bitwise
+        return bitwise.entails(knowledge, query)
+    if backend == "sat":
+        import sat
+        return sat.entails(knowledge, query)
+    if backend != "enumerate":
+        raise ValueError(f"unknown backend: {backend}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
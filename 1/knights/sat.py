@@ -0,0 +1,321 @@
+import heapq
+
+from logic import Sentence, Symbol, Not, And, Or, Implication, Biconditional
+
+
+class CNF():
+    """
+    Clauses equisatisfiable with the sentences added to them, built with
+    the Tseitin transformation: every compound sub-sentence gets a fresh
+    variable constrained to equal it, so the clause count stays linear in
+    the size of the sentence.
+
+    Literals are non-zero ints: variable v is `v` when true, `-v` when false.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        # Variable of each symbol name, and the reverse
+        self.variables = {}
+        self.names = {}
+        # Literal already standing for each compound sub-sentence
+        self.literals = {}
+        self.count = 0
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def symbol(self, name):
+        """Returns the variable of a symbol name, creating it if needed."""
+        if name not in self.variables:
+            variable = self.new_variable()
+            self.variables[name] = variable
+            self.names[variable] = name
+        return self.variables[name]
+
+    def add(self, sentence):
+        """Adds clauses requiring `sentence` to be true."""
+        Sentence.validate(sentence)
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal equal to `sentence`, adding the clauses that
+        define any fresh variables it needs.
+        """
+        if isinstance(sentence, Symbol):
+            return self.symbol(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            children = [self.literal(c) for c in sentence.conjuncts]
+            v = self.new_variable()
+            for child in children:
+                self.clauses.append([-v, child])
+            self.clauses.append([v] + [-child for child in children])
+        elif isinstance(sentence, Or):
+            children = [self.literal(d) for d in sentence.disjuncts]
+            v = self.new_variable()
+            for child in children:
+                self.clauses.append([v, -child])
+            self.clauses.append([-v] + children)
+        elif isinstance(sentence, Implication):
+            p = self.literal(sentence.antecedent)
+            q = self.literal(sentence.consequent)
+            v = self.new_variable()
+            self.clauses.extend([[-v, -p, q], [v, p], [v, -q]])
+        elif isinstance(sentence, Biconditional):
+            p = self.literal(sentence.left)
+            q = self.literal(sentence.right)
+            v = self.new_variable()
+            self.clauses.extend([[-v, -p, q], [-v, p, -q],
+                                 [v, p, q], [v, -p, -q]])
+        else:
+            raise TypeError(f"cannot convert {type(sentence).__name__}")
+
+        self.literals[sentence] = v
+        return v
+
+
+class Solver():
+    """
+    CDCL SAT solver: unit propagation over two watched literals per
+    clause, first-UIP clause learning with non-chronological backjumping,
+    activity-ordered decisions with saved phases, and restarts.
+    """
+
+    def __init__(self, count, clauses):
+        self.count = count
+        self.clauses = []
+        self.watches = {}
+        # Per variable: 1 true, -1 false, 0 unassigned
+        self.values = [0] * (count + 1)
+        self.levels = [0] * (count + 1)
+        self.reasons = [None] * (count + 1)
+        self.phases = [-1] * (count + 1)
+        self.activity = [0.0] * (count + 1)
+        self.bump = 1.0
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.order = [(0.0, v) for v in range(1, count + 1)]
+        self.ok = True
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def value(self, literal):
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, clause):
+        """Adds an input clause, simplifying away repeats and tautologies."""
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            return
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            if self.value(clause[0]) == -1:
+                self.ok = False
+            elif self.value(clause[0]) == 0:
+                self.assign(clause[0], None)
+        else:
+            self.watch(clause)
+
+    def watch(self, clause):
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches.setdefault(clause[0], []).append(index)
+        self.watches.setdefault(clause[1], []).append(index)
+        return index
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by unit clauses, returning the index
+        of a clause made false, or None if there is no conflict.
+        """
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false_literal, [])
+            kept = []
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) == 1:
+                    kept.append(index)
+                    continue
+
+                # Look for another literal to watch instead
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) == -1:
+                        kept.extend(watching[position + 1:])
+                        self.watches[false_literal] = kept
+                        return index
+                    self.assign(clause[0], index)
+            self.watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the first-UIP clause learned from a conflict, its
+        asserting literal first, and the level to jump back to.
+        """
+        level = len(self.trail_limits)
+        seen = set()
+        learned = [None]
+        pending = 0
+        literal = None
+        position = len(self.trail) - 1
+        clause = self.clauses[conflict]
+
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen:
+                    continue
+                if self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump_activity(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # Walk back to the latest assigned literal in the conflict
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+        # Watch the literal of the highest remaining level second
+        deepest = max(range(1, len(learned)),
+                      key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump_activity(self, variable):
+        self.activity[variable] += self.bump
+        if self.activity[variable] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.bump *= 1e-100
+            self.order = [(-self.activity[v], v)
+                          for v in range(1, self.count + 1)
+                          if self.values[v] == 0]
+            heapq.heapify(self.order)
+        heapq.heappush(self.order, (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        """Undoes every assignment made above a decision level."""
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = self.values[variable]
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with the highest activity."""
+        while self.order:
+            _, variable = heapq.heappop(self.order)
+            if self.values[variable] == 0:
+                return variable
+        return None
+
+    def solve(self):
+        """
+        Returns a satisfying assignment as a list indexed by variable
+        (True/False), or None if the clauses are unsatisfiable.
+        """
+        if not self.ok:
+            return None
+        restart_after = 100
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_limits:
+                    return None
+                conflicts += 1
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.watch(learned))
+                self.bump /= 0.95
+                continue
+
+            if conflicts >= restart_after:
+                conflicts = 0
+                restart_after = int(restart_after * 1.5)
+                self.backtrack(0)
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                return [None] + [value == 1 for value in self.values[1:]]
+            self.trail_limits.append(len(self.trail))
+            self.assign(variable * self.phases[variable], None)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model (a dict of symbol name to truth value) in which the
+    sentence is true, or None if there is none.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    assignment = Solver(cnf.count, cnf.clauses).solve()
+    if assignment is None:
+        return None
+    return {name: assignment[variable]
+            for name, variable in cnf.variables.items()}
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, by showing that the
+    knowledge base together with the negated query has no model.
+    """
+    return satisfiable(And(knowledge, Not(query))) is None